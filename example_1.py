@@ -7,60 +7,24 @@ https://docs.google.com/presentation/d/1qgygq21cc5gx_A7Wm2egRztQ4e11USGpy7hVCFOk
 
 """
 
-import os
 import sys
 import time
-from typing import List, Dict, Union, Optional
 
-from PyQt5 import uic
+from PyQt5.QtCore import pyqtSlot
 
-from PyQt5.QtCore import Qt, QSize, pyqtSlot, pyqtSignal, QRegExp, QThread, QTimer
-from PyQt5.QtGui import QFontDatabase, QMovie, QKeyEvent, QResizeEvent, QPixmap, QIntValidator, QDoubleValidator
-from PyQt5.QtWidgets import QApplication, QMainWindow, QMessageBox, QLabel, QWidget, QPushButton, QRadioButton, \
-    QLineEdit, QProgressBar, QGroupBox, QComboBox, QCheckBox, QStackedWidget, QInputDialog, QGridLayout, QFormLayout, QSpacerItem
+from qthreads_and_you.window import BaseExampleWindow, run_example
+from qthreads_and_you.watchdog import StallWatchdog
 
 
-class ExampleWindow(QMainWindow):
+class ExampleWindow(BaseExampleWindow):
     """
     Main GUI for Examples.
     """
+    title = "QThreading Example 1"
 
-    def __init__(self):
-        QMainWindow.__init__(self)
-
-        self.setWindowFlags(Qt.Window)
-
-        self.setWindowTitle("Example")
-        self.setMinimumSize(400, 150)
-
-        print(f"{self.thread().currentThreadId()}: Thread ID (pre-ui)")
-        print(f"{int(self.thread().currentThreadId())}")
-
-        self.setup_ui()
-        self.connect_signals_slots()
-
-        print(f"{self.thread().currentThreadId()}: Thread ID (post-ui)")
-        print(f"{int(self.thread().currentThreadId())}")
-
-    def setup_ui(self):
-        """
-        Setup any UI components
-        """
-        lbl_title = QLabel("QThreading Example 1")
-        self.btn_slowstop = QPushButton("Push to Slowly Close")
-
-        self.setCentralWidget(QWidget())
-        self.centralWidget().setLayout(QFormLayout())
-
-        self.centralWidget().layout().addWidget(lbl_title)
-        self.centralWidget().layout().addWidget(QLabel(" "))
-        self.centralWidget().layout().addWidget(self.btn_slowstop)
-
-    def connect_signals_slots(self):
-        """
-        Connect any signals / slots
-        """
-        self.btn_slowstop.clicked.connect(self.on_slowstop_clicked)
+    def setup_workers(self):
+        self.watchdog = StallWatchdog(parent=self)  # reports the freeze on_slowstop_clicked causes, with its stack
+        self.watchdog.start()
 
     @pyqtSlot(bool, name="on_slowstop_clicked")
     def on_slowstop_clicked(self, value: bool):
@@ -81,18 +45,9 @@ class ExampleWindow(QMainWindow):
         :param kwargs:
         """
         print("...closing")
-
-    @pyqtSlot(QKeyEvent)
-    def keyPressEvent(self, e: QKeyEvent):
-        if e.key() == Qt.Key_Escape:
-            self.close()
+        self.watchdog.stop()
+        self.watchdog.log_histograms()
 
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-
-    test_window = ExampleWindow()
-
-    test_window.show()
-
-    sys.exit(app.exec())  # app.exec() starts event loop
+    sys.exit(run_example(ExampleWindow))
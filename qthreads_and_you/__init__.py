@@ -0,0 +1,77 @@
+"""
+Reusable pieces from QThreads and You
+
+Author: Ben Sutton
+Description: Threading building blocks that grew out of the examples, importable by the examples themselves.
+Names are resolved on first use, so importing the package does not pull in PyQt5 and each Qt submodule is only
+loaded by the pieces that actually need it.
+
+"""
+
+import importlib
+from typing import Dict
+
+_LAZY: Dict[str, str] = {  # name -> submodule it lives in
+    "ThreadPlacement": "affinity",
+    "AsyncWorker": "async_worker",
+    "AutoScaler": "autoscale",
+    "BoundedJobQueue": "bounded",
+    "JobDropped": "bounded",
+    "Overflow": "bounded",
+    "QueueFull": "bounded",
+    "CancellationToken": "cancel",
+    "Cancelled": "cancel",
+    "ResultChannel": "channel",
+    "FutureExecutor": "futures",
+    "JobFuture": "futures",
+    "gather": "futures",
+    "submit": "futures",
+    "JobCache": "memo",
+    "MetricsRegistry": "metrics",
+    "MetricsServer": "metrics",
+    "PoolWorker": "pool",
+    "WorkerPool": "pool",
+    "ProcessWorker": "process_worker",
+    "Pipeline": "pipeline",
+    "Stage": "pipeline",
+    "Priority": "priority",
+    "ProfiledSlots": "profiler",
+    "SlotProfiler": "profiler",
+    "profiled": "profiler",
+    "slot_profiler": "profiler",
+    "PriorityDispatcher": "priority",
+    "ShutdownCoordinator": "shutdown",
+    "SharedBuffer": "shm",
+    "SharedHandle": "shm",
+    "TraceRecorder": "trace",
+    "recorder": "trace",
+    "print_tid": "trace",
+    "dump_trace": "trace",
+    "Job": "service",
+    "ServiceWorker": "service",
+    "WorkerService": "service",
+    "StreamingTableModel": "table_model",
+    "make_table_view": "table_model",
+    "TaskRunner": "tasks",
+    "Histogram": "stats",
+    "StallWatchdog": "watchdog",
+    "BaseExampleWindow": "window",
+    "run_example": "window",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name: str):
+    try:
+        module = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
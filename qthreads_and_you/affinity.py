@@ -0,0 +1,197 @@
+"""
+CPU affinity and priority for the GUI and worker threads
+
+Author: Ben Sutton
+Description: Under load the examples' workers compete with the GUI thread for the same cores and the UI lags.
+ThreadPlacement pins the GUI thread and each worker QThread to a CPU set with os.sched_setaffinity() on the thread's
+native id, and gives workers a QThread.Priority.  On Linux QThread.setPriority() does nothing for normally scheduled
+threads, so the priority is also applied as a per thread nice value.  A worker's settings are applied from its own
+thread as it starts, the only place its native id is known, and every setting applied (or refused by the OS) is
+recorded.
+
+On Linux a new thread inherits its creator's CPU mask.  Once apply_gui() has pinned the GUI thread, every thread it
+starts afterwards (workers, the watchdog, the metrics server, process pool helpers) starts on the GUI's CPUs, so
+with only gui_cpus given, tracked workers default to the other CPUs the process was allowed to use.  Threads that
+are not tracked stay on the GUI's CPUs.
+
+    placement = ThreadPlacement(gui_cpus={0}, worker_cpus={1, 2, 3}, worker_priority=QThread.LowPriority)
+    placement.apply_gui()
+    placement.track(self.worker)  # before start()
+
+"""
+
+import functools
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+from PyQt5.QtCore import Qt, QObject, QThread, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+# nice value standing in for each QThread.Priority, lowering nice below 0 needs CAP_SYS_NICE
+NICE = {
+    QThread.IdlePriority: 19,
+    QThread.LowestPriority: 15,
+    QThread.LowPriority: 10,
+    QThread.NormalPriority: 0,
+    QThread.HighPriority: -5,
+    QThread.HighestPriority: -10,
+    QThread.TimeCriticalPriority: -15,
+}
+
+PRIORITY_NAMES = {
+    "idle": QThread.IdlePriority,
+    "lowest": QThread.LowestPriority,
+    "low": QThread.LowPriority,
+    "normal": QThread.NormalPriority,
+    "high": QThread.HighPriority,
+    "highest": QThread.HighestPriority,
+    "timecritical": QThread.TimeCriticalPriority,
+}
+
+
+def parse_cpus(spec: str) -> Set[int]:
+    """
+    "0", "1-3", "0,2-3" -> set of CPU numbers, the same format as taskset -c
+    """
+    cpus: Set[int] = set()
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        low, _, high = part.partition("-")
+        cpus.update(range(int(low), int(high or low) + 1))
+    return cpus
+
+
+def parse_priority(name: str) -> QThread.Priority:
+    try:
+        return PRIORITY_NAMES[name.strip().lower().replace("priority", "")]
+    except KeyError:
+        raise ValueError(f"unknown thread priority {name!r}, expected one of {', '.join(PRIORITY_NAMES)}") from None
+
+
+def _priority_name(priority: Optional[QThread.Priority]) -> Optional[str]:
+    return None if priority is None else next((n for n, p in PRIORITY_NAMES.items() if p == priority), str(priority))
+
+
+class ThreadPlacement(QObject):
+    """
+    Create it on the GUI thread, apply_gui() there and track() worker threads before they start.
+    """
+    sig_placed = pyqtSignal(dict)  # one record per thread placed, emitted from that thread
+
+    def __init__(self, gui_cpus: Optional[Iterable[int]] = None, worker_cpus: Optional[Iterable[int]] = None,
+                 worker_priority: Optional[QThread.Priority] = None, parent: Optional[QObject] = None):
+        """
+        :param gui_cpus: CPUs for the GUI thread, None leaves it alone
+        :param worker_cpus: default CPUs for tracked workers, None leaves them alone unless gui_cpus is given, then
+        they get the process' original CPUs minus gui_cpus (all of them if that leaves none)
+        :param worker_priority: default priority for tracked workers, None leaves it alone
+        """
+        QObject.__init__(self, parent)
+
+        try:
+            self.original_cpus: Optional[Set[int]] = os.sched_getaffinity(0)  # before apply_gui() narrows it
+        except AttributeError:  # not Linux
+            self.original_cpus = None
+
+        self.gui_cpus = set(gui_cpus) if gui_cpus is not None else None
+        self.worker_cpus = set(worker_cpus) if worker_cpus is not None else None
+        if self.worker_cpus is None and self.gui_cpus is not None and self.original_cpus is not None:
+            self.worker_cpus = (self.original_cpus - self.gui_cpus) or set(self.original_cpus)
+        self.worker_priority = worker_priority
+
+        self.records: List[Dict] = []
+
+    @classmethod
+    def from_environment(cls, parent: Optional[QObject] = None) -> Optional["ThreadPlacement"]:
+        """
+        QTHREADS_GUI_CPUS, QTHREADS_WORKER_CPUS (taskset -c lists) and QTHREADS_WORKER_PRIORITY (e.g. low),
+        None when none of them are set
+        """
+        gui = os.environ.get("QTHREADS_GUI_CPUS")
+        workers = os.environ.get("QTHREADS_WORKER_CPUS")
+        priority = os.environ.get("QTHREADS_WORKER_PRIORITY")
+        if not (gui or workers or priority):
+            return None
+
+        return cls(parse_cpus(gui) if gui else None, parse_cpus(workers) if workers else None,
+                   parse_priority(priority) if priority else None, parent)
+
+    def apply_gui(self):
+        """
+        Place the calling thread, which should be the GUI thread.  Threads it starts from now on inherit gui_cpus
+        until they are placed themselves, track() them.
+        """
+        self._apply("GUI", self.gui_cpus, None)
+
+    def track(self, thread: QThread, cpus: Optional[Iterable[int]] = None,
+              priority: Optional[QThread.Priority] = None, name: Optional[str] = None) -> QThread:
+        """
+        Place thread as soon as it starts, every time it starts
+        :param cpus: overrides worker_cpus
+        :param priority: overrides worker_priority
+        :return: the thread, so the call can wrap construction
+        """
+        cpus = set(cpus) if cpus is not None else self.worker_cpus
+        priority = priority if priority is not None else self.worker_priority
+        name = name or thread.objectName() or type(thread).__name__
+
+        # started is emitted from the new thread itself, a direct connection runs _apply there before run()
+        thread.started.connect(functools.partial(self._apply, name, cpus, priority), Qt.DirectConnection)
+
+        if thread.isRunning():
+            logger.warning("%s is already running, it will only be placed when next started", name)
+        return thread
+
+    def track_workers(self, owner: QObject, name: Optional[str] = None, **kwargs):
+        """
+        track() every thread of a WorkerPool, WorkerService, Pipeline or AsyncWorker, threads added later are not
+        covered
+        """
+        name = name or type(owner).__name__
+        for index, thread in enumerate(getattr(owner, "threads", None) or [owner.worker_thread]):
+            self.track(thread, name=f"{name}[{index}]", **kwargs)
+
+    def _apply(self, name: str, cpus: Optional[Set[int]], priority: Optional[QThread.Priority]):
+        tid = threading.get_native_id()
+        record = {
+            "name": name,
+            "native_id": tid,
+            "cpus_requested": sorted(cpus) if cpus is not None else None,
+            "priority": _priority_name(priority),
+            "errors": [],
+        }
+
+        if cpus is not None:
+            try:
+                os.sched_setaffinity(tid, cpus)
+            except (AttributeError, OSError, ValueError) as e:  # not Linux, or CPUs that are not there
+                record["errors"].append(f"affinity: {e}")
+
+        if priority is not None:
+            QThread.currentThread().setPriority(priority)  # only takes effect for realtime scheduled threads on Linux
+            try:
+                os.setpriority(os.PRIO_PROCESS, tid, NICE[priority])  # per thread on Linux
+            except (AttributeError, OSError) as e:
+                record["errors"].append(f"nice: {e}")
+
+        try:
+            record["cpus"] = sorted(os.sched_getaffinity(tid))
+            record["nice"] = os.getpriority(os.PRIO_PROCESS, tid)
+        except (AttributeError, OSError):
+            record["cpus"] = record["nice"] = None
+
+        self.records.append(record)
+        if record["errors"]:
+            logger.warning("placing %s: %s", name, "; ".join(record["errors"]))
+        self.sig_placed.emit(record)
+
+    def report(self) -> List[Dict]:
+        return list(self.records)
+
+    def log_report(self):
+        for record in self.records:
+            logger.info("%s (%d): cpus %s, nice %s, priority %s%s", record["name"], record["native_id"],
+                        record["cpus"], record["nice"], record["priority"],
+                        f", failed: {'; '.join(record['errors'])}" if record["errors"] else "")
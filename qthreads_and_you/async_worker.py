@@ -0,0 +1,137 @@
+"""
+asyncio event loop hosted on a worker QThread
+
+Author: Ben Sutton
+Description: One QThread per blocking socket / subprocess / file watch call does not scale.  AsyncWorker runs a
+single asyncio loop on its own QThread, moveToThread style like example 3, and accepts coroutines from the GUI
+thread.  Results come back through the usual sig_job_done / sig_job_failed signals, so thousands of concurrent
+I/O operations share one thread.
+
+"""
+
+import asyncio
+import concurrent.futures
+import itertools
+import threading
+from typing import Awaitable, Callable, Optional
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+
+class _LoopRunner(QObject):
+    """
+    Lives on the worker QThread and runs the asyncio loop there.
+    """
+    sig_loop_done = pyqtSignal()
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        QObject.__init__(self)
+
+        self.loop = loop
+
+    @pyqtSlot()
+    def run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            self.loop.close()
+
+        self.sig_loop_done.emit()
+        self.thread().quit()
+
+
+class AsyncWorker(QObject):
+    """
+    Submit coroutines from the GUI thread, they all run on one asyncio loop on one QThread.
+    """
+    sig_job_done = pyqtSignal(int, object)  # job_id, result
+    sig_job_failed = pyqtSignal(int, object)  # job_id, exception
+    sig_worker_done = pyqtSignal()  # every submitted coroutine has finished
+
+    def __init__(self, parent: Optional[QObject] = None):
+        QObject.__init__(self, parent)
+
+        self.loop = asyncio.new_event_loop()  # created here, only ever run on worker_thread
+
+        self.worker_thread = QThread(self)
+        self.worker_thread.setObjectName("async-worker")
+
+        self.runner = _LoopRunner(self.loop)
+        self.runner.moveToThread(self.worker_thread)
+
+        self.worker_thread.started.connect(self.runner.run_loop)
+        self.worker_thread.finished.connect(self.runner.deleteLater)
+
+        self._job_ids = itertools.count(1)
+        self._pending = 0
+        self._pending_lock = threading.Lock()  # submit() on the caller's thread, completion on the loop's
+        self.stopping = False
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def start(self):
+        self.worker_thread.start()
+
+    def stop(self, wait: bool = True):
+        """
+        Stop the loop, cancelling any coroutine still running, then let the thread finish
+        :param wait: block until the thread has exited
+        """
+        self.stopping = True
+        if not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+        if wait:
+            self.worker_thread.wait()
+
+    def submit(self, coro_fn: Callable[..., Awaitable], *args, **kwargs) -> int:
+        """
+        Schedule coro_fn(*args, **kwargs) on the worker's loop, safe to call from any thread
+        :return: job id reported back by sig_job_done / sig_job_failed
+        :raises RuntimeError: once stop() has been called, the coroutine would never run
+        """
+        if self.stopping or self.loop.is_closed():
+            raise RuntimeError("AsyncWorker has been stopped")
+
+        job_id = next(self._job_ids)
+        coro = coro_fn(*args, **kwargs)
+
+        with self._pending_lock:
+            self._pending += 1
+
+        try:
+            future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        except RuntimeError:  # the loop closed under us
+            with self._pending_lock:
+                self._pending -= 1
+            coro.close()  # never scheduled, closing it avoids the "never awaited" warning
+            raise
+        future.add_done_callback(lambda f: self._complete(job_id, f))
+
+        return job_id
+
+    def _complete(self, job_id: int, future: concurrent.futures.Future):
+        # runs on the loop's thread, the signals are queued over to their receivers
+        if future.cancelled():
+            self.sig_job_failed.emit(job_id, concurrent.futures.CancelledError())
+        elif future.exception() is not None:
+            self.sig_job_failed.emit(job_id, future.exception())
+        else:
+            self.sig_job_done.emit(job_id, future.result())
+
+        with self._pending_lock:
+            self._pending -= 1
+            drained = not self._pending
+
+        if drained:
+            self.sig_worker_done.emit()
@@ -0,0 +1,121 @@
+"""
+Autoscaling for WorkerService threads
+
+Author: Ben Sutton
+Description: A fixed number of workers either wastes threads while idle or falls behind in a burst.  AutoScaler
+watches a WorkerService from the GUI thread: when jobs have been waiting in the queue longer than the target it
+adds a thread, when threads have sat idle past the timeout it retires one, always within min / max bounds that
+default to os.cpu_count().  Waits are judged on the jobs started since the last check and on the job still at the
+head of the queue, the only sign of a burst while every thread is stuck on a long job.  New threads are not added
+while the machine's load average already exceeds its cores, more threads would only compete for CPU.  Every decision
+is logged and kept in decisions.
+
+"""
+
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+
+from qthreads_and_you.service import WorkerService
+from qthreads_and_you.stats import percentile
+
+logger = logging.getLogger(__name__)
+
+
+class AutoScaler(QObject):
+    """
+    Create it on the GUI thread next to the WorkerService it scales.
+    """
+    sig_scaled = pyqtSignal(int, int, str)  # threads before, threads after, reason
+
+    def __init__(self, service: WorkerService, min_threads: int = 1, max_threads: Optional[int] = None,
+                 target_wait_ms: float = 50.0, idle_timeout_ms: float = 5000.0, interval_ms: int = 250,
+                 max_load_per_cpu: float = 1.0, parent: Optional[QObject] = None):
+        """
+        :param min_threads: never retire below this, at least 1 or nothing would ever start a job to grow on
+        :param max_threads: never grow past this, defaults to os.cpu_count() * 2 for I/O and GIL releasing jobs
+        :param target_wait_ms: grow when the p90 queue wait since the last check, or the wait of the oldest job
+        still queued, is over this
+        :param idle_timeout_ms: retire a thread once one has been idle this long and the queue is empty
+        :param interval_ms: how often to check
+        :param max_load_per_cpu: skip growing while the 1 minute load average per core is above this
+        """
+        QObject.__init__(self, parent)
+
+        if min_threads < 1:
+            raise ValueError(f"min_threads must be at least 1, got {min_threads}")
+
+        cpus = os.cpu_count() or 1
+
+        self.service = service
+        self.min_threads = min_threads
+        self.max_threads = max(min_threads, max_threads or cpus * 2)
+        self.target_wait_ns = target_wait_ms * 1e6
+        self.idle_timeout_ns = idle_timeout_ms * 1e6
+        self.max_load = max_load_per_cpu * cpus
+
+        self.decisions: List[Dict] = []
+        self._last_check_ns = time.monotonic_ns()
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.check)
+
+    def start(self):
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def _recent_waits(self) -> List[int]:
+        """
+        Queue waits of the jobs started since the last check
+        """
+        since_ns, self._last_check_ns = self._last_check_ns, time.monotonic_ns()
+        return [wait_ns for started_ns, wait_ns in list(self.service.waits_ns) if started_ns > since_ns]
+
+    def _decide(self, action: str, reason: str):
+        before = self.service.thread_count
+
+        if action == "grow":
+            self.service.add_worker()
+        else:
+            self.service.retire_worker()
+
+        after = self.service.thread_count
+        decision = {"time": time.time(), "action": action, "threads_before": before, "threads_after": after,
+                    "reason": reason}
+        self.decisions.append(decision)
+
+        logger.info("%s %d -> %d threads: %s", action, before, after, reason)
+        self.sig_scaled.emit(before, after, reason)
+
+    @pyqtSlot()
+    def check(self):
+        threads = self.service.thread_count
+        waits = self._recent_waits()
+        depth = self.service.jobs.qsize()
+
+        if depth and threads < self.max_threads:
+            p90_ns = percentile(waits, 90) if waits else 0
+            head_ns = self.service.oldest_wait_ns()
+            if max(p90_ns, head_ns) > self.target_wait_ns:
+                load = os.getloadavg()[0] if hasattr(os, "getloadavg") else 0.0
+                if load > self.max_load:
+                    logger.debug("holding at %d threads, load %.2f is over %.2f", threads, load, self.max_load)
+                    return
+
+                self._decide("grow", f"p90 queue wait {p90_ns / 1e6:.1f} ms, oldest queued {head_ns / 1e6:.1f} ms > "
+                                     f"{self.target_wait_ns / 1e6:.1f} ms, {depth} queued")
+                return
+
+        if depth or threads <= self.min_threads:
+            return
+
+        now = time.monotonic_ns()
+        idle = [w for w in self.service.workers if not w.busy and now - w.idle_since_ns > self.idle_timeout_ns]
+        if idle:
+            self._decide("retire", f"{len(idle)} threads idle for over {self.idle_timeout_ns / 1e6:.0f} ms")
@@ -0,0 +1,7 @@
+"""
+Benchmarks for QThreads and You
+
+Author: Ben Sutton
+Description: Headless measurements, run from the repository root with python -m qthreads_and_you.benchmarks.<name>
+
+"""
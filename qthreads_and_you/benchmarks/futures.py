@@ -0,0 +1,73 @@
+"""
+Per job signals against batched futures
+
+Author: Ben Sutton
+Description: Fans out --jobs tiny calls and times how long it takes until every result is back on the GUI thread,
+once with WorkerService.submit() and its one sig_job_done per job, once through FutureExecutor, which batches the
+calls submitted in one event loop pass into a few backend jobs and settles their futures together.
+
+    python -m qthreads_and_you.benchmarks.futures --jobs 20000
+
+"""
+
+import argparse
+import sys
+import time
+
+from PyQt5.QtCore import QCoreApplication
+
+from qthreads_and_you.futures import FutureExecutor, gather
+from qthreads_and_you.service import WorkerService
+
+
+def square(x: int) -> int:
+    return x * x
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="WorkerService per job signals against FutureExecutor batches")
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=2)
+    parser.add_argument("--max-batch", type=int, default=256)
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    expected = [square(i) for i in range(args.jobs)]
+
+    service = WorkerService(args.threads)
+    service.start()
+
+    results = {}
+    service.sig_job_done.connect(lambda job_id, result: results.__setitem__(job_id, result))
+    service.sig_worker_done.connect(app.quit)
+
+    start = time.monotonic()
+    job_ids = [service.submit(square, i) for i in range(args.jobs)]
+    app.exec()
+    per_job = time.monotonic() - start
+    ok = [results[job_id] for job_id in job_ids] == expected
+    service.shutdown()
+
+    executor = FutureExecutor(max_batch=args.max_batch)
+    gathered = []
+
+    start = time.monotonic()
+    gather([executor.submit(square, i) for i in range(args.jobs)]).then(gathered.append).then(lambda _: app.quit())
+    app.exec()
+    batched = time.monotonic() - start
+    ok = ok and gathered == [expected]
+    executor.backend.shutdown()
+
+    stats = executor.stats()
+    print(f"per job signals: {per_job:.3f} s, {args.jobs / per_job:9.0f} jobs/s, {args.jobs} deliveries")
+    print(f"futures:         {batched:.3f} s, {args.jobs / batched:9.0f} jobs/s, {stats['batches']} deliveries, "
+          f"{per_job / batched:.1f}x")
+
+    if not ok:
+        print("FAIL: results differ")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
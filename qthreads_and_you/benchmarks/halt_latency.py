@@ -0,0 +1,64 @@
+"""
+Halt latency of example 6's Worker
+
+Author: Ben Sutton
+Description: Starts example_6.Worker, calls halt_worker() the way the "Halt Worker" button does and measures
+how long the thread takes to notice, as seen from inside run() and from QThread.finished on the caller's side.
+Exits with status 1 if the p99 halt latency is over --max-ms so it can gate a CI run.
+
+    QT_QPA_PLATFORM=offscreen python -m qthreads_and_you.benchmarks.halt_latency
+
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from PyQt5.QtCore import QCoreApplication, QTimer
+
+from example_6 import Worker
+
+from qthreads_and_you.stats import percentile
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--delay-ms", type=float, default=5.0, help="how long the worker runs before being halted")
+    parser.add_argument("--max-ms", type=float, default=1.0, help="fail if the p99 halt latency exceeds this")
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+
+    inside_ms, finished_ms = [], []
+
+    for _ in range(args.runs):
+        worker = Worker(None)
+        halted_ns = []
+
+        worker.finished.connect(lambda: halted_ns.append(time.monotonic_ns()))
+        worker.finished.connect(app.quit)
+        QTimer.singleShot(int(args.delay_ms), worker.halt_worker)
+
+        worker.start()
+        app.exec()
+        worker.wait()
+
+        inside_ms.append(worker.halt_latency_ns / 1e6)
+        finished_ms.append((halted_ns[0] - worker.halt.cancelled_at_ns) / 1e6)
+
+    for name, samples in (("run() exit", inside_ms), ("finished signal", finished_ms)):
+        print(f"{name:>16}: p50 {statistics.median(samples):.3f} ms, p99 {percentile(samples, 99):.3f} ms, "
+              f"max {max(samples):.3f} ms over {len(samples)} runs")
+
+    p99 = percentile(inside_ms, 99)
+    if p99 > args.max_ms:
+        print(f"FAIL: p99 halt latency {p99:.3f} ms is over {args.max_ms} ms")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Pipeline overlap
+
+Author: Ben Sutton
+Description: Runs a decode -> transform -> aggregate chain over --items items twice, once the examples' way with every
+step in a single run_it, once as a Pipeline with --transform-workers threads on the transform stage.  The stage costs
+are sleeps, standing in for I/O or for work that releases the GIL (NumPy, decoders), pure Python CPU work would not
+overlap across threads.  Prints both wall times and the per stage stats.
+
+    python -m qthreads_and_you.benchmarks.pipeline --items 500 --transform-workers 4
+
+"""
+
+import argparse
+import sys
+import time
+
+from PyQt5.QtCore import QCoreApplication
+
+from qthreads_and_you.pipeline import Pipeline, Stage
+
+
+class Sum:
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, item: int):
+        self.total += item
+
+    def result(self) -> int:
+        return self.total
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Sequential run_it against a streaming Pipeline")
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--decode-ms", type=float, default=0.5)
+    parser.add_argument("--transform-ms", type=float, default=2.0)
+    parser.add_argument("--transform-workers", type=int, default=4)
+    parser.add_argument("--buffer", type=int, default=32)
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+
+    def decode(i: int) -> int:
+        time.sleep(args.decode_ms / 1000)
+        return i
+
+    def transform(i: int) -> int:
+        time.sleep(args.transform_ms / 1000)
+        return i * 2
+
+    start = time.monotonic()
+    expected = sum(transform(decode(i)) for i in range(args.items))
+    sequential = time.monotonic() - start
+
+    total = Sum()
+    pipeline = Pipeline([
+        Stage(decode, buffer=args.buffer),
+        Stage(transform, workers=args.transform_workers, buffer=args.buffer),
+        Stage(total, name="aggregate", finish=total.result),
+    ])
+
+    results, report = [], {}
+    pipeline.sig_output.connect(results.append)
+    pipeline.sig_finished.connect(report.update)
+    pipeline.sig_finished.connect(app.quit)
+
+    start = time.monotonic()
+    pipeline.run(range(args.items))
+    app.exec()
+    streamed = time.monotonic() - start
+    pipeline.stop()
+
+    print(f"sequential run_it: {sequential:.3f} s, pipeline: {streamed:.3f} s, {sequential / streamed:.1f}x")
+    for name, stats in report["stages"].items():
+        print(f"  {name:>10}: {stats['workers']} workers, {stats['items_in']} items, {stats['items_per_s']:8.0f} items/s, "
+              f"utilisation {stats['utilisation']:.0%}, blocked {stats['blocked_s']:.3f} s, "
+              f"max buffered {stats['max_buffered']} / {stats['buffer']}")
+
+    if results != [expected]:
+        print(f"FAIL: pipeline gave {results}, expected {expected}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Shared memory vs copying payload transfer
+
+Author: Ben Sutton
+Description: A ProcessWorker job produces a payload of each size and the GUI thread gets a readable view of it.
+The copy path returns the bytes, pickled through the process pool.  The shared path fills a SharedBuffer and
+returns only its handle.  Times run from submit() to the payload being readable on the GUI thread, with the
+shared path also paying for attach and release.
+
+    python -m qthreads_and_you.benchmarks.shm --sizes 1 16 256 1024
+
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from PyQt5.QtCore import QCoreApplication
+
+from qthreads_and_you.process_worker import ProcessWorker
+from qthreads_and_you.shm import SharedBuffer
+
+MB = 1 << 20
+
+
+def _fill(view: memoryview):
+    # same cost on both paths, doubles the filled region each pass instead of building a temporary
+    view[0:1] = b"\x01"
+    filled, total = 1, len(view)
+    while filled < total:
+        chunk = min(filled, total - filled)
+        view[filled:filled + chunk] = view[:chunk]
+        filled += chunk
+
+
+def produce_copy(nbytes: int) -> bytearray:
+    payload = bytearray(nbytes)
+    _fill(memoryview(payload))
+    return payload
+
+
+def produce_shared(nbytes: int):
+    buf = SharedBuffer.create(nbytes)
+    _fill(buf.memoryview())
+    return buf.detach()
+
+
+def transfer_ms(app: QCoreApplication, worker: ProcessWorker, producer, nbytes: int) -> float:
+    received = []
+
+    def on_done(job_id, result):
+        if producer is produce_shared:
+            with SharedBuffer.attach(result) as buf:
+                view = buf.memoryview()
+                received.append(view[0] + view[-1])
+        else:
+            view = memoryview(result)
+            received.append(view[0] + view[-1])
+        app.quit()
+
+    worker.sig_job_done.connect(on_done)
+    start_ns = time.monotonic_ns()
+    worker.submit(producer, nbytes)
+    app.exec()
+    elapsed_ms = (time.monotonic_ns() - start_ns) / 1e6
+    worker.sig_job_done.disconnect(on_done)
+
+    assert received == [2], "payload was not readable"
+    return elapsed_ms
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Shared memory vs copying payload transfer from a ProcessWorker")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 16, 256, 1024], help="payload sizes in MB")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    worker = ProcessWorker(processes=1)
+    worker.sig_job_failed.connect(lambda job_id, error: (print(f"job failed: {error!r}"), app.exit(1)))
+
+    transfer_ms(app, worker, produce_copy, 1)  # spawn the child process outside of the timings
+
+    for size_mb in args.sizes:
+        nbytes = size_mb * MB
+        results = {}
+        for name, producer in (("copy", produce_copy), ("shared", produce_shared)):
+            results[name] = statistics.median(transfer_ms(app, worker, producer, nbytes) for _ in range(args.runs))
+
+        print(f"{size_mb:>6} MB: copy {results['copy']:9.1f} ms, shared {results['shared']:9.1f} ms, "
+              f"{results['copy'] / results['shared']:5.1f}x")
+
+    worker.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Coordinated shutdown timing
+
+Author: Ben Sutton
+Description: Starts a mix of worker threads (a WorkerPool busy with queued jobs, a WorkerService and Worker(QThread)s
+looping on a CancellationToken like example 6) and measures how long ShutdownCoordinator.shutdown_all() takes to stop
+them.  With --stubborn one extra thread ignores every request to stop, to show the deadline holding.  Like
+BaseExampleWindow, each run only tears its threads down once the coordinator reports sig_overrun_stopped.  Exits with
+status 1 if shutdown took longer than the deadline plus --slack-ms, or if any thread would have been torn down while
+still running.
+
+    python -m qthreads_and_you.benchmarks.shutdown --workers 8 --stubborn
+
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QThread, QTimer
+
+from qthreads_and_you.stats import percentile
+from qthreads_and_you.cancel import CancellationToken
+from qthreads_and_you.pool import WorkerPool
+from qthreads_and_you.service import WorkerService
+from qthreads_and_you.shutdown import ShutdownCoordinator
+
+
+class LoopWorker(QThread):
+    def __init__(self):
+        QThread.__init__(self)
+
+        self.halt = CancellationToken()
+
+    def run(self):
+        while not self.halt.sleep(2):
+            pass
+
+
+class StubbornWorker(QThread):
+    def run(self):
+        time.sleep(self.seconds)
+
+
+def one_shutdown(workers: int, deadline_ms: int, stubborn: bool) -> dict:
+    coordinator = ShutdownCoordinator(deadline_ms)
+
+    pool = WorkerPool(workers)
+    pool.start()
+    for _ in range(workers * 4):
+        pool.submit(time.sleep, 0.005)
+    coordinator.track_workers(pool)
+
+    service = WorkerService(workers)
+    service.start()
+    coordinator.track_workers(service)
+
+    loops = [LoopWorker() for _ in range(workers)]
+    for loop in loops:
+        loop.start()
+        coordinator.track(loop, loop.halt.cancel)
+
+    stubborn_worker = None
+    if stubborn:
+        stubborn_worker = StubbornWorker()
+        stubborn_worker.seconds = deadline_ms / 1000 * 2
+        stubborn_worker.start()
+        coordinator.track(stubborn_worker)
+
+    time.sleep(0.05)  # let everything get going
+    report = coordinator.shutdown_all()
+
+    held = len(coordinator.overrun())
+    threads = coordinator.threads()
+    unheld = sum(thread.isRunning() for thread in threads) - held  # a window would be destroyed with these running
+
+    if held:  # hold off tearing down, as the window does, until the coordinator says they are done
+        event_loop = QEventLoop()
+        coordinator.sig_overrun_stopped.connect(event_loop.quit)
+        QTimer.singleShot(deadline_ms * 10, event_loop.quit)
+        event_loop.exec()
+
+    report["torn_down_running"] = max(unheld, sum(thread.isRunning() for thread in threads))
+    for thread in threads:  # only so this process does not abort, a window would have been destroyed already
+        thread.wait()
+    pool.stop()
+
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="ShutdownCoordinator stop time across a mix of workers")
+    parser.add_argument("--workers", type=int, default=4, help="threads of each kind")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--deadline-ms", type=int, default=500)
+    parser.add_argument("--slack-ms", type=float, default=50.0)
+    parser.add_argument("--stubborn", action="store_true", help="add one thread that ignores shutdown")
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+
+    reports = []
+    for _ in range(args.runs):
+        reports.append(one_shutdown(args.workers, args.deadline_ms, args.stubborn))
+        app.processEvents()  # deliver the finished / deleteLater events left behind by the run
+    elapsed = [r["elapsed_ms"] for r in reports]
+
+    print(f"{reports[0]['threads']} threads: p50 {statistics.median(elapsed):.1f} ms, p99 {percentile(elapsed, 99):.1f} ms, "
+          f"max {max(elapsed):.1f} ms, deadline {args.deadline_ms} ms, overruns {sum(bool(r['overrun']) for r in reports)}")
+
+    if max(elapsed) > args.deadline_ms + args.slack_ms:
+        print(f"FAIL: shutdown took {max(elapsed):.1f} ms")
+        return 1
+
+    torn_down = sum(r["torn_down_running"] for r in reports)
+    if torn_down:
+        print(f"FAIL: {torn_down} threads would have been destroyed while still running")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
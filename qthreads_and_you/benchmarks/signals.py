@@ -0,0 +1,282 @@
+"""
+Cross thread signal / slot benchmark
+
+Author: Ben Sutton
+Description: Puts numbers on the patterns from the examples.  For every receiver pattern, connection type and
+payload it measures the round trip latency of a ping / pong pair of signals (p50 / p99) and how many one way
+signals per second the receiver gets through.  Runs headless and writes its results as JSON so they can be
+compared across PyQt versions.
+
+Receiver patterns:
+    qthread_subclass - Worker(QThread) with a slot, examples 2, 5 and 6.  The QThread object lives on the GUI
+                       thread, so its slots run there too.
+    move_to_thread   - Worker(QObject) moved onto a QThread, examples 3 and 4.
+
+    python -m qthreads_and_you.benchmarks.signals --output signals.json
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import Qt, QCoreApplication, QMetaObject, QObject, QThread, QTimer, pyqtSignal, pyqtSlot, \
+    PYQT_VERSION_STR, QT_VERSION_STR
+
+from qthreads_and_you.stats import percentile
+
+CONNECTION_TYPES = {
+    "auto": Qt.AutoConnection,
+    "queued": Qt.QueuedConnection,
+    "blocking_queued": Qt.BlockingQueuedConnection,
+    "direct": Qt.DirectConnection,
+}
+
+PATTERNS = ("qthread_subclass", "move_to_thread")
+
+PAYLOAD_SIZES = (0, 1024, 65536, 1048576)
+
+
+class Echo(QObject):
+    """
+    Receiver for the move_to_thread pattern, answers every ping with a pong.
+    """
+    sig_pong = pyqtSignal(object)
+    sig_count_done = pyqtSignal(int)
+
+    def __init__(self):
+        QObject.__init__(self)
+
+        self.count = 0
+        self.expected = 0
+
+    @pyqtSlot(object)
+    def on_ping(self, payload: object):
+        self.sig_pong.emit(payload)
+
+    @pyqtSlot(object)
+    def on_count(self, payload: object):
+        self.count += 1
+        if self.count == self.expected:
+            self.sig_count_done.emit(self.count)
+
+
+class EchoThread(QThread):
+    """
+    Receiver for the qthread_subclass pattern, same slots as Echo but on a QThread subclass.
+    """
+    sig_pong = pyqtSignal(object)
+    sig_count_done = pyqtSignal(int)
+
+    def __init__(self):
+        QThread.__init__(self)
+
+        self.count = 0
+        self.expected = 0
+
+    @pyqtSlot(object)
+    def on_ping(self, payload: object):
+        self.sig_pong.emit(payload)
+
+    @pyqtSlot(object)
+    def on_count(self, payload: object):
+        self.count += 1
+        if self.count == self.expected:
+            self.sig_count_done.emit(self.count)
+
+
+class StrEcho(Echo):
+    """
+    Echo variant with str signals, PyQt converts str to QString and back on every hop.
+    """
+    sig_pong = pyqtSignal(str)
+
+    @pyqtSlot(str)
+    def on_ping(self, payload: str):
+        self.sig_pong.emit(payload)
+
+    @pyqtSlot(str)
+    def on_count(self, payload: str):
+        Echo.on_count(self, payload)
+
+
+class Driver(QObject):
+    """
+    Lives on the GUI thread and drives one measurement.
+    """
+    sig_ping = pyqtSignal(object)
+    sig_count = pyqtSignal(object)
+
+    def __init__(self, app: QCoreApplication):
+        QObject.__init__(self)
+
+        self.app = app
+        self.payload = None
+        self.remaining = 0
+        self.sent_ns = 0
+        self.in_emit = False
+        self.waiting = False
+        self.latencies_ns: List[int] = []
+
+    def round_trips(self, payload: object, count: int) -> List[int]:
+        self.payload = payload
+        self.remaining = count
+        self.latencies_ns = []
+
+        QTimer.singleShot(0, self.send_ping)
+        self.app.exec()
+
+        return self.latencies_ns
+
+    def send_ping(self):
+        # direct replies arrive inside emit(), so loop here instead of recursing through on_pong
+        while self.remaining:
+            self.in_emit = True
+            self.waiting = True
+            self.sent_ns = time.monotonic_ns()
+            self.sig_ping.emit(self.payload)
+            self.in_emit = False
+
+            if self.waiting:
+                return  # queued reply, on_pong picks things up again
+
+        self.app.quit()
+
+    @pyqtSlot(object)
+    def on_pong(self, payload: object):
+        self.latencies_ns.append(time.monotonic_ns() - self.sent_ns)
+        self.remaining -= 1
+        self.waiting = False
+
+        if not self.in_emit:
+            self.send_ping()
+
+    def burst(self, receiver: QObject, payload: object, count: int) -> float:
+        receiver.count = 0
+        receiver.expected = count
+        done_ns = []
+
+        def on_done(_):
+            done_ns.append(time.monotonic_ns())
+            QMetaObject.invokeMethod(self.app, "quit", Qt.QueuedConnection)  # may be on the worker thread
+
+        receiver.sig_count_done.connect(on_done, Qt.DirectConnection)
+
+        def send_all():
+            for _ in range(count):
+                self.sig_count.emit(payload)
+
+        start_ns = time.monotonic_ns()
+        QTimer.singleShot(0, send_all)
+        self.app.exec()
+
+        receiver.sig_count_done.disconnect(on_done)
+        return count / ((done_ns[0] - start_ns) / 1e9)
+
+
+class StrDriver(Driver):
+    sig_ping = pyqtSignal(str)
+    sig_count = pyqtSignal(str)
+
+    @pyqtSlot(str)
+    def on_pong(self, payload: str):
+        Driver.on_pong(self, payload)
+
+
+def run_case(app: QCoreApplication, pattern: str, connection: str, payload_type: str, size: int,
+             round_trips: int, burst: int) -> Optional[Dict]:
+    """
+    Measure one combination, None when the combination would deadlock
+    """
+    if payload_type == "str":
+        driver, payload = StrDriver(app), "x" * size
+    else:
+        driver, payload = Driver(app), b"x" * size
+
+    if pattern == "qthread_subclass":
+        if payload_type == "str" or connection == "blocking_queued":
+            # str only runs against the QObject receiver to keep the matrix small, and Qt refuses a
+            # blocking queued call into the caller's own thread
+            return None
+        receiver = EchoThread()
+        receiver.start()  # running like it does in the examples, its slots still land on the GUI thread
+        thread = receiver
+    else:
+        receiver = StrEcho() if payload_type == "str" else Echo()
+        thread = QThread()
+        receiver.moveToThread(thread)
+        thread.start()
+
+    conn_type = CONNECTION_TYPES[connection]
+    driver.sig_ping.connect(receiver.on_ping, conn_type)
+    driver.sig_count.connect(receiver.on_count, conn_type)
+    receiver.sig_pong.connect(driver.on_pong)  # reply always uses AutoConnection, back onto the GUI thread
+
+    latencies = driver.round_trips(payload, round_trips)
+    per_second = driver.burst(receiver, payload, burst)
+
+    thread.quit()
+    thread.wait()
+
+    return {
+        "pattern": pattern,
+        "connection": connection,
+        "payload_type": payload_type,
+        "payload_bytes": size,
+        "round_trips": len(latencies),
+        "latency_p50_us": statistics.median(latencies) / 1000,
+        "latency_p99_us": percentile(latencies, 99) / 1000,
+        "signals_per_second": per_second,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cross thread signal / slot latency and throughput")
+    parser.add_argument("--round-trips", type=int, default=2000)
+    parser.add_argument("--burst", type=int, default=20000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=PAYLOAD_SIZES, help="payload sizes in bytes")
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+
+    results = []
+    for pattern in PATTERNS:
+        for connection in CONNECTION_TYPES:
+            for payload_type in ("object", "str"):
+                for size in args.sizes:
+                    result = run_case(app, pattern, connection, payload_type, size, args.round_trips, args.burst)
+                    if result is None:
+                        continue
+
+                    results.append(result)
+                    print(f"{pattern:>16} {connection:>15} {payload_type:>6} {size:>8} B: "
+                          f"p50 {result['latency_p50_us']:8.1f} us, p99 {result['latency_p99_us']:8.1f} us, "
+                          f"{result['signals_per_second']:10.0f} signals/s")
+
+    report = {
+        "pyqt": PYQT_VERSION_STR,
+        "qt": QT_VERSION_STR,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "qpa": os.environ.get("QT_QPA_PLATFORM"),
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.output}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""
+Memory soak for the examples' worker lifecycles
+
+Author: Ben Sutton
+Description: Examples 2, 5 and 6 create a Worker(QThread) that is never deleteLater'd, it is only freed along with
+the window that parents it.  Examples 3 and 4 rely on deleteLater ordering between worker and worker_thread.  This
+runs those lifecycles thousands of times over and samples RSS, live QObjects per class and tracemalloc's top
+allocators as it goes.  Exits with status 1 when traced Python memory or any class's live object count grows past
+its threshold between the end of the warm up and the last sample, or RSS is still growing over the second half of
+the run.  RSS climbs for the first few thousand threads while malloc's arenas and Qt's per thread data settle, so
+only its trend once that is over counts.
+
+Patterns:
+    qthread      - Worker(QThread) parented to a stand in window that is deleteLater'd after it finishes,
+                   examples 2 and 5
+    unparented   - Worker(QThread) with no parent, waited on and dropped, how headless.BatchRunner runs them
+    halt         - example_6.Worker itself, parented like the window does, halted straight after starting
+    movetothread - Worker(QObject) on a QThread with the examples 3 / 4 wiring, sig_worker_done -> quit and
+                   deleteLater, finished -> deleteLater
+
+The qthread and movetothread Workers are copies of the examples' minus the 5 second sleeps.  This is what caught
+examples 3 and 4 leaking a PyQt proxy object per run while run_it was a plain method rather than a @pyqtSlot.
+
+    python -m qthreads_and_you.benchmarks.soak --cycles 5000 --pattern all
+
+"""
+
+import argparse
+import collections
+import gc
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from PyQt5 import sip
+from PyQt5.QtCore import QCoreApplication, QObject, QThread, QTimer, pyqtSignal, pyqtSlot
+
+from example_6 import Worker as HaltWorker
+
+from qthreads_and_you.trace import print_tid, recorder
+
+
+class SleepWorker(QThread):
+    """
+    examples 2 and 5
+    """
+
+    def __init__(self, parent: Optional[QObject], work_s: float):
+        QThread.__init__(self, parent)
+
+        self.work_s = work_s
+
+    def run(self):
+        print_tid("(starting)")
+        time.sleep(self.work_s)
+        print_tid("(finished)")
+
+
+class MovedWorker(QObject):
+    """
+    examples 3 and 4
+    """
+    sig_worker_done = pyqtSignal()
+
+    def __init__(self, work_s: float):
+        QObject.__init__(self)
+
+        self.work_s = work_s
+
+    @pyqtSlot()
+    def run_it(self):
+        print_tid("(starting)")
+        time.sleep(self.work_s)
+
+        print_tid("(finished)")
+        self.sig_worker_done.emit()
+
+
+def start_qthread(done: Callable[[], None], work_s: float) -> tuple:
+    window = QObject()  # stands in for ExampleWindow, closing it takes the Worker with it
+    worker = SleepWorker(window, work_s)
+
+    worker.finished.connect(window.deleteLater)
+    worker.finished.connect(done)
+    worker.start()
+    return (window,)
+
+
+def start_unparented(done: Callable[[], None], work_s: float) -> tuple:
+    worker = SleepWorker(None, work_s)
+
+    worker.finished.connect(done)
+    worker.start()
+    return (worker,)
+
+
+def start_halt(done: Callable[[], None], work_s: float) -> tuple:
+    window = QObject()
+    worker = HaltWorker(window)
+
+    worker.finished.connect(window.deleteLater)
+    worker.finished.connect(done)
+    worker.start()
+    QTimer.singleShot(int(work_s * 1000), worker.halt_worker)
+    return (window,)
+
+
+def start_movetothread(done: Callable[[], None], work_s: float) -> tuple:
+    window = QObject()
+    worker_thread = QThread(window)
+
+    worker = MovedWorker(work_s)
+    worker.moveToThread(worker_thread)
+
+    worker_thread.started.connect(worker.run_it)
+    worker_thread.finished.connect(worker_thread.deleteLater)
+    worker_thread.finished.connect(window.deleteLater)
+    worker_thread.finished.connect(done)
+
+    worker.sig_worker_done.connect(worker_thread.quit)
+    worker.sig_worker_done.connect(worker.deleteLater)
+
+    worker_thread.start()
+    return (window, worker)
+
+
+PATTERNS: Dict[str, Callable[[Callable[[], None], float], tuple]] = {
+    "qthread": start_qthread,
+    "unparented": start_unparented,
+    "halt": start_halt,
+    "movetothread": start_movetothread,
+}
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:  # not Linux, the peak is the best there is
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def live_qobjects() -> Dict[str, int]:
+    """
+    Python wrapped QObjects per class, wrappers whose C++ object is gone are counted as "<deleted>"
+    """
+    counts: Dict[str, int] = collections.Counter()
+    for obj in gc.get_objects():
+        if isinstance(obj, QObject):
+            counts["<deleted>" if sip.isdeleted(obj) else type(obj).__name__] += 1
+    return dict(counts)
+
+
+class SoakRunner(QObject):
+    """
+    Runs `cycles` rounds of `batch` worker lifecycles back to back, sampling memory every `sample_every` cycles.
+    """
+    sig_done = pyqtSignal()
+
+    def __init__(self, patterns: List[str], cycles: int, batch: int, work_ms: float, sample_every: int,
+                 parent: Optional[QObject] = None):
+        QObject.__init__(self, parent)
+
+        self.patterns = patterns
+        self.cycles = cycles
+        self.batch = batch
+        self.work_s = work_ms / 1000
+        self.sample_every = sample_every
+
+        self.cycle = 0
+        self.samples: List[Dict] = []
+        self.snapshots: List[tracemalloc.Snapshot] = []
+
+        self._waiting = 0
+        self._alive: List[tuple] = []  # keeps this cycle's Python wrappers around until it is done
+        self._start = time.monotonic()
+
+    def start(self):
+        QTimer.singleShot(0, self._next_cycle)
+
+    def sample(self):
+        recorder.clear()  # the trace ring buffers are bounded anyway, filling them up is not growth
+        gc.collect()
+        self.samples.append({
+            "cycle": self.cycle,
+            "seconds": time.monotonic() - self._start,
+            "rss_mb": rss_bytes() / 2 ** 20,
+            "traced_mb": tracemalloc.get_traced_memory()[0] / 2 ** 20,
+            "qobjects": live_qobjects(),
+        })
+        self.snapshots.append(tracemalloc.take_snapshot())
+        del self.snapshots[1:-1]  # first and latest are all the comparison needs
+
+    def _next_cycle(self):
+        if self.cycle % self.sample_every == 0 or self.cycle == self.cycles:  # last cycle's deleteLaters have run
+            self.sample()
+
+        if self.cycle == self.cycles:
+            self.sig_done.emit()
+            return
+
+        self._alive = []
+        self._waiting = self.batch * len(self.patterns)
+        for _ in range(self.batch):
+            for pattern in self.patterns:
+                self._alive.append(PATTERNS[pattern](self._one_done, self.work_s))
+
+    def _one_done(self):
+        self._waiting -= 1
+        if self._waiting:
+            return
+
+        for objects in self._alive:
+            for obj in objects:
+                if isinstance(obj, QThread) and not sip.isdeleted(obj):
+                    obj.wait()  # finished is emitted just before run() returns
+        self._alive = []
+
+        self.cycle += 1
+        QTimer.singleShot(0, self._next_cycle)  # back through the event loop so the deleteLaters are delivered
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Worker lifecycle memory soak")
+    parser.add_argument("--pattern", choices=list(PATTERNS) + ["all"], default="all")
+    parser.add_argument("--cycles", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=4, help="workers of each pattern started per cycle")
+    parser.add_argument("--work-ms", type=float, default=0.0, help="how long each worker runs")
+    parser.add_argument("--sample-every", type=int, default=100, help="cycles between samples")
+    parser.add_argument("--warmup", type=int, default=500, help="cycles before the baseline sample")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=4.0, help="over the second half of the run")
+    parser.add_argument("--max-traced-growth-mb", type=float, default=1.0, help="tracemalloc, over the whole run")
+    parser.add_argument("--max-object-growth", type=int, default=0, help="per class, live QObjects")
+    parser.add_argument("--top", type=int, default=10, help="tracemalloc allocators to show")
+    parser.add_argument("--output", help="write the samples to this JSON file")
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+
+    patterns = list(PATTERNS) if args.pattern == "all" else [args.pattern]
+
+    tracemalloc.start(8)
+
+    # warm up first so imports, caches and Qt's own first use allocations don't count as growth
+    warmup = SoakRunner(patterns, args.warmup, args.batch, args.work_ms, args.warmup)
+    warmup.sig_done.connect(app.quit)
+    warmup.start()
+    app.exec()
+
+    runner = SoakRunner(patterns, args.cycles, args.batch, args.work_ms, args.sample_every)
+    runner.sig_done.connect(app.quit)
+    runner.start()
+    app.exec()
+
+    tracemalloc.stop()
+
+    for sample in runner.samples:
+        objects = ", ".join(f"{name} {n}" for name, n in sorted(sample["qobjects"].items())) or "none"
+        print(f"cycle {sample['cycle']:>6} {sample['seconds']:7.1f} s: rss {sample['rss_mb']:7.1f} MB, "
+              f"traced {sample['traced_mb']:6.2f} MB, qobjects: {objects}")
+
+    first, last = runner.samples[0], runner.samples[-1]
+    workers = args.cycles * args.batch * len(patterns)
+    print(f"\n{workers} worker lifecycles ({', '.join(patterns)}) in {last['seconds']:.1f} s")
+
+    print(f"top {args.top} allocators by growth:")
+    for stat in runner.snapshots[-1].compare_to(runner.snapshots[0], "lineno")[:args.top]:
+        print(f"  {stat}")
+
+    failures = []
+
+    rss_growth = last["rss_mb"] - runner.samples[len(runner.samples) // 2]["rss_mb"]
+    if rss_growth > args.max_rss_growth_mb:
+        failures.append(f"RSS grew {rss_growth:.1f} MB over the second half, limit {args.max_rss_growth_mb} MB")
+
+    traced_growth = last["traced_mb"] - first["traced_mb"]
+    if traced_growth > args.max_traced_growth_mb:
+        failures.append(f"traced memory grew {traced_growth:.2f} MB, limit {args.max_traced_growth_mb} MB")
+
+    for name in sorted(set(first["qobjects"]) | set(last["qobjects"])):
+        growth = last["qobjects"].get(name, 0) - first["qobjects"].get(name, 0)
+        if growth > args.max_object_growth:
+            failures.append(f"{growth} more live {name} objects, limit {args.max_object_growth}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"patterns": patterns, "workers": workers, "samples": runner.samples}, f, indent=2)
+        print(f"samples written to {args.output}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
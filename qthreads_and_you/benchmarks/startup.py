@@ -0,0 +1,71 @@
+"""
+Cold start benchmark
+
+Author: Ben Sutton
+Description: Launches a fresh interpreter per run and measures the time from just before the process is spawned
+until the example window's show() returns.  The "eager" case first imports the import block every example used
+to carry (uic, QFontDatabase, QMovie, QStackedWidget, ...) so the cost of those imports stays visible.
+
+    python -m qthreads_and_you.benchmarks.startup --runs 20 example_3 example_6
+
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from qthreads_and_you.stats import percentile
+
+EAGER_IMPORTS = """
+from PyQt5 import uic
+from PyQt5.QtCore import Qt, QObject, QSize, pyqtSlot, pyqtSignal, QRegExp, QThread, QTimer
+from PyQt5.QtGui import QFontDatabase, QMovie, QKeyEvent, QResizeEvent, QPixmap, QIntValidator, QDoubleValidator
+from PyQt5.QtWidgets import QApplication, QMainWindow, QMessageBox, QLabel, QWidget, QPushButton, QRadioButton, \\
+    QLineEdit, QProgressBar, QGroupBox, QComboBox, QCheckBox, QStackedWidget, QInputDialog, QGridLayout, QFormLayout, QSpacerItem
+"""
+
+CHILD = """
+import sys, time
+{eager}
+from PyQt5.QtWidgets import QApplication
+import {module}
+app = QApplication(sys.argv[:1])
+window = {module}.ExampleWindow()
+window.show()
+print(time.monotonic_ns())
+"""
+
+
+def cold_start_ms(module: str, eager: bool) -> float:
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    code = CHILD.format(module=module, eager=EAGER_IMPORTS if eager else "")
+
+    start_ns = time.monotonic_ns()
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+
+    shown_ns = int(out.strip().splitlines()[-1])  # CLOCK_MONOTONIC is shared between processes on Linux
+    return (shown_ns - start_ns) / 1e6
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Interpreter start to first show() for the examples")
+    parser.add_argument("modules", nargs="*", default=[f"example_{n}" for n in range(1, 7)])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        for eager in (False, True):
+            cold_start_ms(module, eager)  # warm the OS file cache, not counted
+            samples = [cold_start_ms(module, eager) for _ in range(args.runs)]
+
+            print(f"{module:>10} {'eager' if eager else 'lazy':>5}: p50 {statistics.median(samples):7.1f} ms, "
+                  f"p90 {percentile(samples, 90):7.1f} ms over {len(samples)} runs")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
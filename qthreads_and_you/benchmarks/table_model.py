@@ -0,0 +1,114 @@
+"""
+GUI heartbeat while a worker streams rows into a table
+
+Author: Ben Sutton
+Description: A worker produces --rows rows of (id, value, label).  First they are streamed into a
+StreamingTableModel behind a QTableView in chunks of --chunk rows, then done the examples' way, the whole list sent
+in one signal and poured into a QTableWidget by the GUI thread (second, so tearing down its items does not land in
+the streaming run).  A StallWatchdog heartbeat measures how late the GUI event loop gets during
+each, and the time until the last row is in the table is reported too.
+
+    python -m qthreads_and_you.benchmarks.table_model --rows 200000
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtWidgets import QApplication, QTableWidget, QTableWidgetItem
+
+from qthreads_and_you.table_model import StreamingTableModel, make_table_view
+from qthreads_and_you.watchdog import StallWatchdog
+
+COLUMNS = [("id", "q"), ("value", "d"), ("label", "O")]
+
+
+class RowWorker(QThread):
+    sig_rows = pyqtSignal(list)  # the whole result in one go
+
+    def __init__(self, rows: int, chunk: int, model: StreamingTableModel = None):
+        QThread.__init__(self)
+
+        self.rows = rows
+        self.chunk = chunk
+        self.model = model
+
+    def run(self):
+        result = []
+        for start in range(0, self.rows, self.chunk):
+            chunk = [(i, i * 0.5, f"row {i}") for i in range(start, min(start + self.chunk, self.rows))]
+            if self.model is not None:
+                self.model.append_rows(chunk)
+            else:
+                result.extend(chunk)
+
+        if self.model is None:
+            self.sig_rows.emit(result)
+
+
+def run_case(app: QApplication, rows: int, chunk: int, streaming: bool) -> dict:
+    watchdog = StallWatchdog(threshold_ms=100, heartbeat_ms=10)
+    done_ns = []
+
+    if streaming:
+        model = StreamingTableModel(COLUMNS)
+        view = make_table_view(model)
+        worker = RowWorker(rows, chunk, model)
+        model.rowsInserted.connect(lambda *_: model.rows == rows and (done_ns.append(time.monotonic_ns()), app.quit()))
+    else:
+        view = QTableWidget(0, len(COLUMNS))
+        view.setHorizontalHeaderLabels([name for name, _ in COLUMNS])
+        worker = RowWorker(rows, chunk)
+
+        def fill(result: list):
+            view.setRowCount(len(result))
+            for r, row in enumerate(result):
+                for c, value in enumerate(row):
+                    view.setItem(r, c, QTableWidgetItem(str(value)))
+            done_ns.append(time.monotonic_ns())
+            app.quit()
+
+        worker.sig_rows.connect(fill)
+
+    view.resize(600, 400)
+    view.show()
+
+    watchdog.start()
+    start_ns = time.monotonic_ns()
+    worker.start()
+    app.exec()
+    watchdog.stop()
+    worker.wait()
+    view.close()
+
+    return {
+        "seconds": (done_ns[0] - start_ns) / 1e9,
+        "lag_max_ms": watchdog.lag_ms.max,
+        "stall_max_ms": watchdog.stall_ms.max,
+        "stalls": watchdog.stall_ms.count,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="QTableWidget rebuild against StreamingTableModel")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--chunk", type=int, default=1000, help="rows per append from the worker")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    for name, streaming in (("StreamingTableModel", True), ("one list + QTableWidget", False)):
+        result = run_case(app, args.rows, args.chunk, streaming)
+        print(f"{name:>24}: {args.rows} rows in {result['seconds']:.2f} s, heartbeat lag max "
+              f"{result['lag_max_ms']:.0f} ms, {result['stalls']} stalls, longest {result['stall_max_ms']:.0f} ms")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""
+Bounded job queue with backpressure policies
+
+Author: Ben Sutton
+Description: Nothing stops a producer like sig_custom.emit() from piling unlimited work onto a worker, and bursty
+input then costs unbounded memory and latency.  BoundedJobQueue is a drop in for the queue.Queue behind
+WorkerService with a maximum depth and a policy for when it is full:
+
+    BLOCK        the producer waits (optionally up to a timeout, then QueueFull)
+    DROP_OLDEST  the oldest queued job is dropped to make room
+    DROP_NEWEST  the job being put is dropped
+    COALESCE     a queued job with the same key is replaced in place by the new one, blocks if no key matches
+
+put() returns whichever job was dropped so the caller can report it.  Depth and rejection counters are
+available from stats().
+
+"""
+
+import collections
+import enum
+import queue
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Deque, Dict, Hashable, Optional
+
+if TYPE_CHECKING:
+    from qthreads_and_you.service import Job
+
+
+class Overflow(enum.Enum):
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    COALESCE = "coalesce"
+
+
+class QueueFull(Exception):
+    """
+    Raised by a BLOCK / COALESCE put() that timed out
+    """
+
+
+class JobDropped(Exception):
+    """
+    Reported for a job the queue discarded, args[0] is the overflow policy that dropped it
+    """
+
+
+def job_fn_key(job: "Job") -> Hashable:
+    """
+    Default coalescing key, the latest call of each function wins
+    """
+    return job.fn
+
+
+class BoundedJobQueue:
+    """
+    Thread safe, bounded FIFO of Jobs.  None is the workers' stop sentinel and is never bounded or dropped.
+    """
+
+    def __init__(self, maxsize: int, policy: Overflow = Overflow.BLOCK, timeout: Optional[float] = None,
+                 key: Callable[["Job"], Hashable] = job_fn_key):
+        """
+        :param maxsize: most jobs held at once
+        :param policy: what put() does when the queue is full
+        :param timeout: longest a blocking put() waits, None waits forever
+        :param key: coalescing key for the COALESCE policy
+        """
+        self.maxsize = maxsize
+        self.policy = policy
+        self.timeout = timeout
+        self.key = key
+
+        self._items: Deque[Optional["Job"]] = collections.deque()
+        self._jobs = 0  # items that are Jobs, sentinels do not count towards maxsize
+        self._keyed: Dict[Hashable, "Job"] = {}  # COALESCE only, key -> queued job
+        self._mutex = threading.Lock()
+        self._not_empty = threading.Condition(self._mutex)
+        self._not_full = threading.Condition(self._mutex)
+
+        self.high_water = 0
+        self.put_count = 0
+        self.dropped_oldest = 0
+        self.dropped_newest = 0
+        self.coalesced = 0
+        self.blocked = 0  # puts that had to wait
+        self.blocked_now = 0  # puts waiting right now
+        self.blocked_ns = 0
+        self.timeouts = 0
+
+    def qsize(self) -> int:
+        return self._jobs
+
+    def stats(self) -> Dict:
+        with self._mutex:
+            return {
+                "depth": self._jobs,
+                "maxsize": self.maxsize,
+                "policy": self.policy.value,
+                "high_water": self.high_water,
+                "put": self.put_count,
+                "dropped_oldest": self.dropped_oldest,
+                "dropped_newest": self.dropped_newest,
+                "coalesced": self.coalesced,
+                "blocked": self.blocked,
+                "blocked_ms": self.blocked_ns / 1e6,
+                "timeouts": self.timeouts,
+            }
+
+    def put(self, job: Optional["Job"]) -> Optional["Job"]:
+        """
+        Queue a job, applying the overflow policy when full
+        :return: the job that was dropped to apply the policy, if any
+        """
+        with self._not_full:
+            if job is None:
+                self._items.append(None)
+                self._not_empty.notify()
+                return None
+
+            self.put_count += 1
+            dropped = None
+
+            if self.policy is Overflow.COALESCE:
+                queued = self._coalesce(job)
+                if queued is not None:
+                    return queued
+
+            if self._jobs >= self.maxsize:
+                if self.policy is Overflow.DROP_NEWEST:
+                    self.dropped_newest += 1
+                    return job
+                elif self.policy is Overflow.DROP_OLDEST:
+                    dropped = self._pop_oldest_job()
+                    self.dropped_oldest += 1
+                else:
+                    self._wait_not_full(job)
+                    if self.policy is Overflow.COALESCE:  # another producer may have queued the key while we waited
+                        queued = self._coalesce(job)
+                        if queued is not None:
+                            return queued
+
+            self._items.append(job)
+            self._jobs += 1
+            self.high_water = max(self.high_water, self._jobs)
+            if self.policy is Overflow.COALESCE:
+                self._keyed[self.key(job)] = job
+                if self.blocked_now:
+                    self._not_full.notify_all()  # a blocked put with the same key can coalesce into this one
+
+            self._not_empty.notify()
+            return dropped
+
+    def head(self) -> Optional["Job"]:
+        """
+        The job that has been queued longest, without taking it
+        """
+        with self._mutex:
+            return next((item for item in self._items if item is not None), None)
+
+    def _coalesce(self, job: "Job") -> Optional["Job"]:
+        """
+        Replace a queued job with the same key in place, called with the mutex held
+        :return: the replaced job, None when no queued job has the key
+        """
+        key = self.key(job)
+        queued = self._keyed.get(key)
+        if queued is None:
+            return None
+
+        self._items[self._items.index(queued)] = job  # keeps the old job's place in line
+        self._keyed[key] = job
+        self.coalesced += 1
+        return queued
+
+    def _wait_not_full(self, job: "Job"):
+        """
+        Wait for room, or under COALESCE for a queued job with the same key to replace
+        """
+        coalesce = self.policy is Overflow.COALESCE
+        key = self.key(job) if coalesce else None
+
+        self.blocked += 1
+        self.blocked_now += 1
+        start_ns = time.monotonic_ns()
+        try:
+            if not self._not_full.wait_for(lambda: self._jobs < self.maxsize or (coalesce and key in self._keyed),
+                                           self.timeout):
+                self.timeouts += 1
+                raise QueueFull()
+        finally:
+            self.blocked_now -= 1
+            self.blocked_ns += time.monotonic_ns() - start_ns
+
+    def _pop_oldest_job(self) -> "Job":
+        for index, item in enumerate(self._items):
+            if item is not None:
+                del self._items[index]
+                self._jobs -= 1
+                return item
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Optional["Job"]:
+        """
+        Next job, or None when a worker is being told to stop
+        """
+        with self._not_empty:
+            if not self._not_empty.wait_for(lambda: self._items, timeout if block else 0):
+                raise queue.Empty()
+
+            item = self._items.popleft()
+            if item is not None:
+                self._jobs -= 1
+                if self.policy is Overflow.COALESCE and self._keyed.get(self.key(item)) is item:
+                    del self._keyed[self.key(item)]
+                self._not_full.notify()
+
+            return item
@@ -0,0 +1,82 @@
+"""
+Cancellation token for worker threads
+
+Author: Ben Sutton
+Description: Example 6 stops its Worker by flipping a plain bool that run() only looks at between
+time.sleep(2) calls.  CancellationToken wraps a threading.Event instead, so a worker blocked in
+token.sleep() / token.wait() wakes the moment cancel() is called, from any thread.
+
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class Cancelled(Exception):
+    """
+    Raised by CancellationToken.raise_if_cancelled
+    """
+
+
+class CancellationToken:
+    """
+    Thread safe, event backed cancellation flag that work loops can block on.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+        self.cancelled_at_ns: Optional[int] = None  # time.monotonic_ns() of the first cancel()
+
+    def __bool__(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        """
+        Request cancellation, wakes every thread waiting on the token
+        """
+        if self.cancelled_at_ns is None:
+            self.cancelled_at_ns = time.monotonic_ns()
+
+        self._event.set()
+
+    def reset(self):
+        """
+        Clear the token so it can be reused for another run
+        """
+        self._event.clear()
+        self.cancelled_at_ns = None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until cancelled or the timeout runs out
+        :param timeout: seconds, None waits forever
+        :return: True if the token was cancelled
+        """
+        return self._event.wait(timeout)
+
+    def sleep(self, seconds: float) -> bool:
+        """
+        Interruptible replacement for time.sleep
+        :param seconds: how long to sleep when nobody cancels
+        :return: True if the sleep was cut short by cancel()
+        """
+        return self._event.wait(seconds)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise Cancelled()
+
+    def latency_ns(self) -> Optional[int]:
+        """
+        Nanoseconds since cancel() was called, None if it was not
+        """
+        if self.cancelled_at_ns is None:
+            return None
+
+        return time.monotonic_ns() - self.cancelled_at_ns
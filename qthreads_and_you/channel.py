@@ -0,0 +1,115 @@
+"""
+Batched / coalescing result channel from workers to the GUI thread
+
+Author: Ben Sutton
+Description: A worker that emits one signal per result posts one QMetaCallEvent per result to the GUI thread,
+and a fast enough worker keeps ExampleWindow too busy to repaint.  ResultChannel lets workers put() as often
+as they like and hands the GUI thread one batched signal every max_items results or every interval_ms,
+whichever comes first.  With latest_only=True intermediate values are dropped and only the newest one is
+delivered, which is all a progress bar needs.  The flush timer only runs while something is waiting, an idle
+channel does not wake the GUI thread.
+
+"""
+
+import threading
+from typing import List, Optional
+
+from PyQt5.QtCore import Qt, QObject, QTimer, pyqtSignal, pyqtSlot
+
+
+class ResultChannel(QObject):
+    """
+    Thread safe put() side for workers, batched signals on the thread the channel lives on.
+
+    Create it on the GUI thread.
+    """
+    sig_batch = pyqtSignal(list)  # batch mode, every result put since the last flush
+    sig_latest = pyqtSignal(object)  # latest_only mode, newest value put since the last flush
+
+    sig_request_flush = pyqtSignal()  # internal, lets a worker trigger a size based flush
+    _sig_arm = pyqtSignal()  # internal, starts the flush timer once the first item is waiting
+
+    _EMPTY = object()
+
+    def __init__(self, max_items: int = 1000, interval_ms: int = 16, latest_only: bool = False,
+                 parent: Optional[QObject] = None):
+        QObject.__init__(self, parent)
+
+        self.max_items = max_items
+        self.latest_only = latest_only
+
+        self.put_count = 0
+        self.flush_count = 0
+        self.dropped_count = 0  # latest_only values overwritten before they were delivered
+
+        self._lock = threading.Lock()
+        self._items: List[object] = []
+        self._latest = self._EMPTY
+        self._flush_requested = False
+        self._armed = False  # the flush timer has been asked to start and not flushed since
+        self._closed = False
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.flush)
+
+        self.sig_request_flush.connect(self.flush, Qt.QueuedConnection)
+        self._sig_arm.connect(self._arm, Qt.QueuedConnection)  # a QTimer can only be started from its own thread
+
+    def put(self, item: object):
+        """
+        Hand a result to the GUI thread, safe to call from any thread
+        """
+        request = False
+        with self._lock:
+            self.put_count += 1
+
+            if self.latest_only:
+                if self._latest is not self._EMPTY:
+                    self.dropped_count += 1
+                self._latest = item
+            else:
+                self._items.append(item)
+                request = len(self._items) >= self.max_items and not self._flush_requested
+                if request:
+                    self._flush_requested = True
+
+            arm = not self._armed and not self._closed
+            self._armed = True
+
+        if arm:
+            self._sig_arm.emit()
+        if request:
+            self.sig_request_flush.emit()
+
+    @pyqtSlot()
+    def _arm(self):
+        if not self._closed:
+            self.timer.start()
+
+    @pyqtSlot()
+    def flush(self):
+        """
+        Deliver whatever is pending, runs on the channel's thread
+        """
+        with self._lock:
+            items, self._items = self._items, []
+            latest, self._latest = self._latest, self._EMPTY
+            self._flush_requested = False
+            self._armed = False  # the next put() starts the timer again
+
+        if items:
+            self.flush_count += 1
+            self.sig_batch.emit(items)
+        elif latest is not self._EMPTY:
+            self.flush_count += 1
+            self.sig_latest.emit(latest)
+
+    def close(self):
+        """
+        Stop the flush timer and deliver anything still pending
+        """
+        self._closed = True
+        self.timer.stop()
+        self.flush()
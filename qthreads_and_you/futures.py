@@ -0,0 +1,262 @@
+"""
+Futures for worker jobs, resolved on the GUI thread
+
+Author: Ben Sutton
+Description: Every example hand wires its own signals for one result, sig_worker_done.connect(...),
+finished.connect(lambda: self.close()).  submit(fn, *args) returns a JobFuture instead.  It resolves on the GUI
+thread, takes then() continuations and gather() waits on many of them at once.  FutureExecutor does not send each
+call to the backend as its own job.  Calls submitted in the same pass of the event loop go as one batch job, so a
+fan out of a thousand small calls costs a handful of cross thread signals each way rather than a thousand.
+
+    submit(load, path).then(parse).then(self.show_table, self.show_error)
+    gather([submit(render, tile) for tile in tiles]).then(self.on_all_tiles)
+
+"""
+
+import functools
+import logging
+import os
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from PyQt5.QtCore import QCoreApplication, QObject, QTimer, pyqtSlot
+
+from qthreads_and_you.service import WorkerService
+
+logger = logging.getLogger(__name__)
+
+_PENDING, _DONE, _FAILED = range(3)
+
+
+class JobFuture:
+    """
+    The eventual result of a call, settled and calling back on the thread FutureExecutor lives on.
+    """
+    __slots__ = ("_state", "_value", "_callbacks")
+
+    def __init__(self):
+        self._state = _PENDING
+        self._value: object = None
+        self._callbacks: List[Callable[["JobFuture"], None]] = []
+
+    def done(self) -> bool:
+        return self._state != _PENDING
+
+    def failed(self) -> bool:
+        return self._state == _FAILED
+
+    def result(self) -> object:
+        """
+        :return: the call's return value, its exception is raised if it failed
+        """
+        if self._state == _PENDING:
+            raise RuntimeError("JobFuture is still pending, use then()")
+        if self._state == _FAILED:
+            raise self._value
+        return self._value
+
+    def exception(self) -> Optional[BaseException]:
+        return self._value if self._state == _FAILED else None
+
+    def add_done_callback(self, callback: Callable[["JobFuture"], None]):
+        """
+        Call callback(future) once settled, from a later pass of the event loop if it already is
+        """
+        if self._state == _PENDING:
+            self._callbacks.append(callback)
+        else:
+            QTimer.singleShot(0, functools.partial(callback, self))  # same ordering as if it had been pending
+
+    def then(self, on_done: Callable[[object], object],
+             on_error: Optional[Callable[[BaseException], object]] = None) -> "JobFuture":
+        """
+        Chain a continuation, run on the GUI thread
+        :param on_done: called with the result, may return a value or another JobFuture to wait on
+        :param on_error: called with the exception instead, without one the failure passes down the chain
+        :return: future for whatever on_done / on_error returns
+        """
+        chained = JobFuture()
+
+        def run(future: JobFuture):
+            if future._state == _FAILED and on_error is None:
+                chained._settle(_FAILED, future._value)
+                return
+
+            try:
+                value = (on_error if future._state == _FAILED else on_done)(future._value)
+            except Exception as e:
+                chained._settle(_FAILED, e)
+                return
+
+            if isinstance(value, JobFuture):
+                value.add_done_callback(lambda inner: chained._settle(inner._state, inner._value))
+            else:
+                chained._settle(_DONE, value)
+
+        self.add_done_callback(run)
+        return chained
+
+    def _settle(self, state: int, value: object):
+        if self._state != _PENDING:
+            return
+        self._state = state
+        self._value = value
+
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception:
+                logger.exception("JobFuture callback %r failed", callback)
+
+
+def gather(futures: Sequence[JobFuture]) -> JobFuture:
+    """
+    :return: future for the list of every result, in order, or the first failure
+    """
+    gathered = JobFuture()
+    results: List[object] = [None] * len(futures)
+    remaining = [len(futures)]
+
+    if not futures:
+        gathered._settle(_DONE, [])
+
+    def one_done(index: int, future: JobFuture):
+        if future._state == _FAILED:
+            gathered._settle(_FAILED, future._value)
+            return
+
+        results[index] = future._value
+        remaining[0] -= 1
+        if not remaining[0]:
+            gathered._settle(_DONE, results)
+
+    for index, future in enumerate(futures):
+        future.add_done_callback(functools.partial(one_done, index))
+
+    return gathered
+
+
+def _run_batch(calls: List[Tuple[Callable, tuple, dict]]) -> List[Tuple[bool, object]]:
+    outcomes = []
+    for fn, args, kwargs in calls:
+        try:
+            outcomes.append((True, fn(*args, **kwargs)))
+        except Exception as e:
+            outcomes.append((False, e))
+    return outcomes
+
+
+class FutureExecutor(QObject):
+    """
+    Batches submit()s into backend jobs and settles their futures, create it and submit on the GUI thread.
+    """
+
+    def __init__(self, backend: Optional[QObject] = None, max_batch: int = 64, parent: Optional[QObject] = None):
+        """
+        :param backend: WorkerPool, WorkerService, JobCache or anything else with submit() and sig_job_done /
+        sig_job_failed, a started WorkerService with one thread per core by default
+        :param max_batch: calls per backend job, keep it low enough that a big fan out still spreads over threads
+        """
+        QObject.__init__(self, parent)
+
+        if backend is None:
+            backend = WorkerService(threads=os.cpu_count() or 1, parent=self)
+            backend.start()
+
+        self.backend = backend
+        self.max_batch = max_batch
+
+        self.calls = 0
+        self.batches = 0
+
+        self._queued: List[Tuple[Callable, tuple, dict]] = []
+        self._queued_futures: List[JobFuture] = []
+        self._batches: Dict[int, List[JobFuture]] = {}  # backend job id -> futures, in call order
+
+        backend.sig_job_done.connect(self.on_job_done)
+        backend.sig_job_failed.connect(self.on_job_failed)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> JobFuture:
+        """
+        Queue fn(*args, **kwargs), it goes to the backend with everything else submitted this event loop pass
+        """
+        future = JobFuture()
+        self.calls += 1
+
+        if not self._queued:
+            QTimer.singleShot(0, self.flush)
+        self._queued.append((fn, args, kwargs))
+        self._queued_futures.append(future)
+
+        if len(self._queued) >= self.max_batch:
+            self.flush()
+        return future
+
+    def map(self, fn: Callable, items: Sequence) -> JobFuture:
+        """
+        :return: future for [fn(item) for item in items], computed on the backend
+        """
+        return gather([self.submit(fn, item) for item in items])
+
+    @pyqtSlot()
+    def flush(self):
+        """
+        Send whatever has been submitted so far as one backend job
+        """
+        if not self._queued:
+            return
+
+        calls, self._queued = self._queued, []
+        futures, self._queued_futures = self._queued_futures, []
+
+        self.batches += 1
+        try:
+            job_id = self.backend.submit(_run_batch, calls)
+        except Exception as e:  # QueueFull
+            for future in futures:
+                future._settle(_FAILED, e)
+            return
+
+        self._batches[job_id] = futures  # a dropped job is reported later, from the event loop, under this id
+
+    @pyqtSlot(int, object)
+    def on_job_done(self, job_id: int, outcomes: object):
+        futures = self._batches.pop(job_id, None)
+        if futures is None:  # someone else's job on a shared backend
+            return
+
+        for future, (ok, value) in zip(futures, outcomes):
+            future._settle(_DONE if ok else _FAILED, value)
+
+    @pyqtSlot(int, object)
+    def on_job_failed(self, job_id: int, error: object):
+        futures = self._batches.pop(job_id, None)
+        if futures is None:  # someone else's job, e.g. one our flush() pushed out of a shared DROP_OLDEST queue
+            return
+
+        for future in futures:
+            future._settle(_FAILED, error)
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.calls, "batches": self.batches, "in_flight": len(self._batches)}
+
+
+_default: Optional[FutureExecutor] = None
+
+
+def default_executor() -> FutureExecutor:
+    """
+    FutureExecutor used by submit(), made on first use and parented to the QCoreApplication
+    """
+    global _default
+    if _default is None:
+        _default = FutureExecutor(parent=QCoreApplication.instance())
+    return _default
+
+
+def submit(fn: Callable, *args, **kwargs) -> JobFuture:
+    """
+    Run fn(*args, **kwargs) on the default executor's worker threads
+    :return: future settled on the GUI thread
+    """
+    return default_executor().submit(fn, *args, **kwargs)
@@ -0,0 +1,171 @@
+"""
+Headless batch mode for the example Workers
+
+Author: Ben Sutton
+Description: Every example needs a QApplication and a QMainWindow, so none of the worker logic runs on a server
+without a display or in a throughput test.  BatchRunner drives the examples' own Worker classes from a plain
+QCoreApplication event loop instead: Worker(QThread)s (examples 2, 5, 6) are started and awaited on finished,
+Worker(QObject)s (examples 3, 4) are moved onto a QThread, kicked off with run_it and awaited on
+sig_worker_done.  Workers with a halt_worker slot are halted after --halt-after-ms.  Once every job is done
+the wall time and jobs per second are reported.
+
+    python -m qthreads_and_you.headless example_3 example_4 example_6 --repeat 4
+    python -m qthreads_and_you.headless --file jobs.txt --concurrency 8
+
+A job is an example module name, optionally with the Worker class to use (example_4:Worker).  Job files hold one
+job per line, # starts a comment.
+
+"""
+
+import argparse
+import collections
+import functools
+import importlib
+import itertools
+import os
+import sys
+import time
+from typing import Deque, Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import QCoreApplication, QObject, QThread, QTimer, pyqtSignal
+
+
+def parse_job(spec: str) -> Tuple[str, str]:
+    module, _, cls = spec.strip().partition(":")
+    return module, cls or "Worker"
+
+
+def resolve_job(spec: str) -> type:
+    """
+    Import a job's Worker class
+    :raises ValueError: when the module or class does not exist or is not a Worker BatchRunner can drive
+    """
+    module_name, cls_name = parse_job(spec)
+    try:
+        worker_cls = getattr(importlib.import_module(module_name), cls_name)
+    except ImportError as e:
+        raise ValueError(f"{spec}: cannot import {module_name} ({e})") from None
+    except AttributeError:
+        raise ValueError(f"{spec}: {module_name} has no {cls_name}") from None
+
+    if not isinstance(worker_cls, type) or not (issubclass(worker_cls, QThread) or hasattr(worker_cls, "run_it")):
+        raise ValueError(f"{spec}: {cls_name} is neither a QThread nor a QObject with run_it")
+    return worker_cls
+
+
+def read_job_file(path: str) -> List[str]:
+    with open(path) as f:
+        return [line.split("#", 1)[0].strip() for line in f if line.split("#", 1)[0].strip()]
+
+
+class BatchRunner(QObject):
+    """
+    Runs Worker jobs at most `concurrency` at a time, emits sig_all_done when the last one finishes.
+    """
+    sig_job_done = pyqtSignal(str, float)  # job spec, seconds it took
+    sig_all_done = pyqtSignal()
+
+    def __init__(self, jobs: List[str], concurrency: int, halt_after_ms: int, parent: Optional[QObject] = None):
+        QObject.__init__(self, parent)
+
+        self.queue: Deque[str] = collections.deque(jobs)
+        self.total = len(jobs)
+        self.concurrency = concurrency
+        self.halt_after_ms = halt_after_ms
+
+        self.done = 0
+        self._running: Dict[int, Tuple[QObject, ...]] = {}  # keeps running workers (and threads) alive
+        self._run_ids = itertools.count()
+
+    def start(self):
+        if not self.queue:
+            QTimer.singleShot(0, self.sig_all_done.emit)
+            return
+
+        for _ in range(min(self.concurrency, len(self.queue))):
+            self._start_next()
+
+    def _start_next(self):
+        spec = self.queue.popleft()
+        worker_cls = resolve_job(spec)
+
+        run_id = next(self._run_ids)
+        finish = functools.partial(self._finished, run_id, spec, time.monotonic())
+
+        if issubclass(worker_cls, QThread):  # examples 2, 5 and 6
+            worker = worker_cls(None)
+            worker.finished.connect(finish)
+            self._running[run_id] = (worker,)
+            worker.start()
+        else:  # examples 3 and 4, the moveToThread pattern
+            thread = QThread()
+            worker = worker_cls()
+            worker.moveToThread(thread)
+
+            thread.started.connect(worker.run_it)
+            worker.sig_worker_done.connect(thread.quit)
+            thread.finished.connect(finish)
+            self._running[run_id] = (worker, thread)
+            thread.start()
+
+        if hasattr(worker, "halt_worker"):  # example 6 runs until halted
+            QTimer.singleShot(self.halt_after_ms, worker.halt_worker)
+
+    def _finished(self, run_id: int, spec: str, start: float):
+        elapsed = time.monotonic() - start
+        for obj in self._running.pop(run_id):
+            obj.deleteLater()
+
+        self.done += 1
+        self.sig_job_done.emit(spec, elapsed)
+
+        if self.queue:
+            self._start_next()
+        elif not self._running:
+            self.sig_all_done.emit()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the examples' Worker classes headless under QCoreApplication")
+    parser.add_argument("jobs", nargs="*", help="example modules, optionally module:WorkerClass")
+    parser.add_argument("--file", help="read jobs from this file, one per line")
+    parser.add_argument("--repeat", type=int, default=1, help="run the job list this many times")
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--halt-after-ms", type=int, default=100, help="when to halt workers that run until halted")
+    parser.add_argument("--quiet", action="store_true", help="skip the per job lines")
+    args = parser.parse_args(argv)
+
+    jobs = list(args.jobs)
+    if args.file:
+        jobs.extend(read_job_file(args.file))
+    if not jobs:
+        parser.error("no jobs given")
+
+    errors = []
+    for spec in dict.fromkeys(jobs):  # every job checked up front, a bad one must not stop the batch half way
+        try:
+            resolve_job(spec)
+        except ValueError as e:
+            errors.append(str(e))
+    if errors:
+        parser.error("; ".join(errors))
+    jobs *= args.repeat
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+
+    runner = BatchRunner(jobs, args.concurrency, args.halt_after_ms)
+    if not args.quiet:
+        runner.sig_job_done.connect(lambda spec, elapsed: print(f"{spec}: {elapsed:.3f} s"))
+    runner.sig_all_done.connect(app.quit)
+
+    start = time.monotonic()
+    runner.start()
+    app.exec()
+    wall = time.monotonic() - start
+
+    print(f"{runner.done} jobs in {wall:.3f} s, {runner.done / wall:.2f} jobs/s, concurrency {args.concurrency}")
+    return 0 if runner.done == runner.total else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
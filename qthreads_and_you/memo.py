@@ -0,0 +1,165 @@
+"""
+Result memoization and in-flight deduplication for worker jobs
+
+Author: Ben Sutton
+Description: Clicking btn_slowstop again with the same inputs makes the worker redo the same work, and clicking
+while a job is still running starts a duplicate.  JobCache sits in front of anything with the WorkerPool /
+WorkerService submit() and job signals.  Finished results are kept in a bounded LRU keyed by (fn, args, kwargs)
+with an optional time to live, and identical requests made while a job is running attach to that job instead of
+starting another one (single flight).
+
+"""
+
+import collections
+import itertools
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+
+
+class JobCache(QObject):
+    """
+    Caching front end for a worker backend, create it on the same thread as the backend.
+    """
+    sig_job_done = pyqtSignal(int, object)  # request_id, result
+    sig_job_failed = pyqtSignal(int, object)  # request_id, exception
+
+    def __init__(self, backend: QObject, max_entries: int = 256, ttl_s: Optional[float] = None,
+                 parent: Optional[QObject] = None):
+        """
+        :param backend: WorkerPool, WorkerService or anything else with submit() and sig_job_done / sig_job_failed
+        :param max_entries: least recently used results are evicted past this many
+        :param ttl_s: results older than this are treated as missing, None keeps them until evicted
+        """
+        QObject.__init__(self, parent)
+
+        self.backend = backend
+        self.max_entries = max_entries
+        self.ttl_ns = None if ttl_s is None else int(ttl_s * 1e9)
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0  # requests that attached to a job already in flight
+        self.evictions = 0
+        self.uncacheable = 0  # requests with unhashable arguments, passed straight through
+
+        self._results: "collections.OrderedDict[Hashable, Tuple[object, int]]" = collections.OrderedDict()
+        self._in_flight: Dict[Hashable, List[int]] = {}  # key -> waiting request ids
+        self._job_keys: Dict[int, Optional[Hashable]] = {}  # backend job id -> key
+        self._passthrough: Dict[int, int] = {}  # backend job id -> request id, uncacheable requests
+        self._request_ids = itertools.count(1)
+
+        backend.sig_job_done.connect(self.on_job_done)
+        backend.sig_job_failed.connect(self.on_job_failed)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "uncacheable": self.uncacheable,
+            "entries": len(self._results),
+            "in_flight": len(self._in_flight),
+        }
+
+    @staticmethod
+    def make_key(fn: Callable, args: tuple, kwargs: dict) -> Optional[Hashable]:
+        key = (fn, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def submit(self, fn: Callable, *args, **kwargs) -> int:
+        """
+        Answer from the cache, attach to a running identical job, or submit a new one
+        :return: request id, the result always arrives through sig_job_done / sig_job_failed
+        """
+        request_id = next(self._request_ids)
+        key = self.make_key(fn, args, kwargs)
+
+        if key is None:
+            self.uncacheable += 1
+            self._passthrough[self.backend.submit(fn, *args, **kwargs)] = request_id
+            return request_id
+
+        cached = self._lookup(key)
+        if cached is not None:
+            self.hits += 1
+            # deliver from the event loop like a real job would, callers may connect after submit()
+            QTimer.singleShot(0, lambda: self.sig_job_done.emit(request_id, cached[0]))
+            return request_id
+
+        waiting = self._in_flight.get(key)
+        if waiting is not None:
+            self.coalesced += 1
+            waiting.append(request_id)
+            return request_id
+
+        job_id = self.backend.submit(fn, *args, **kwargs)  # may raise, e.g. QueueFull, nothing is recorded then
+        self.misses += 1
+        self._in_flight[key] = [request_id]
+        self._job_keys[job_id] = key
+        return request_id
+
+    def _lookup(self, key: Hashable) -> Optional[Tuple[object, int]]:
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+
+        if self.ttl_ns is not None and time.monotonic_ns() - entry[1] > self.ttl_ns:
+            del self._results[key]
+            self.evictions += 1
+            return None
+
+        self._results.move_to_end(key)
+        return entry
+
+    def _store(self, key: Hashable, result: object):
+        self._results[key] = (result, time.monotonic_ns())
+        self._results.move_to_end(key)
+
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, fn: Optional[Callable] = None):
+        """
+        Drop cached results, all of them or only those of fn
+        """
+        if fn is None:
+            self._results.clear()
+            return
+
+        for key in [k for k in self._results if k[0] is fn]:
+            del self._results[key]
+
+    @pyqtSlot(int, object)
+    def on_job_done(self, job_id: int, result: object):
+        if job_id in self._passthrough:
+            self.sig_job_done.emit(self._passthrough.pop(job_id), result)
+            return
+
+        key = self._job_keys.pop(job_id, None)
+        if key is None:
+            return  # submitted to the backend by someone else
+
+        self._store(key, result)
+        for request_id in self._in_flight.pop(key):
+            self.sig_job_done.emit(request_id, result)
+
+    @pyqtSlot(int, object)
+    def on_job_failed(self, job_id: int, error: object):
+        if job_id in self._passthrough:
+            self.sig_job_failed.emit(self._passthrough.pop(job_id), error)
+            return
+
+        key = self._job_keys.pop(job_id, None)
+        if key is None:
+            return
+
+        for request_id in self._in_flight.pop(key):  # failures are not cached
+            self.sig_job_failed.emit(request_id, error)
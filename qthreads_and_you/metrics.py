@@ -0,0 +1,378 @@
+"""
+Metrics registry with a Prometheus endpoint
+
+Author: Ben Sutton
+Description: Nothing in the examples says how busy a worker thread is, how much is queued up for it or how long
+jobs wait.  MetricsRegistry holds counters, gauges and histograms and a list of collectors that read them off
+WorkerPool, WorkerService, StallWatchdog and the slot profiler.  Collectors only ever run on the GUI thread, from
+a QTimer, so they can touch QObjects safely.  MetricsServer serves the last collected values in Prometheus text
+format from a plain http.server on a background thread, and dump_json() writes the same values to a file.
+
+"""
+
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from PyQt5 import sip
+from PyQt5.QtCore import QObject, QTimer, pyqtSlot
+
+from qthreads_and_you.stats import BUCKETS_MS, Histogram
+
+logger = logging.getLogger(__name__)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+class Metric:
+    """
+    One metric family, a value (or Histogram) per label set.
+    """
+
+    def __init__(self, name: str, kind: str, help_text: str, bounds: Sequence[float] = BUCKETS_MS):
+        """
+        :param kind: "counter", "gauge" or "histogram"
+        :param bounds: histogram bucket bounds
+        """
+        self.name = name
+        self.kind = kind
+        self.help_text = help_text
+        self.bounds = tuple(bounds)
+        self.samples: Dict[Labels, object] = {}
+
+    def set(self, value: float, **labels):
+        self.samples[_labels(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _labels(labels)
+        self.samples[key] = self.samples.get(key, 0.0) + amount
+
+    def histogram(self, **labels) -> Histogram:
+        """
+        The Histogram for this label set, created on first use
+        """
+        key = _labels(labels)
+        hist = self.samples.get(key)
+        if hist is None:
+            hist = self.samples[key] = Histogram(self.bounds)
+        return hist
+
+    def attach(self, hist: Histogram, **labels):
+        """
+        Export a Histogram something else already fills in, e.g. a StallWatchdog's lag_ms
+        """
+        self.samples[_labels(labels)] = hist
+
+    def observe(self, value: float, **labels):
+        self.histogram(**labels).add(value)
+
+    def prometheus_lines(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+        for labels, value in sorted(self.samples.items()):
+            if self.kind != "histogram":
+                lines.append(f"{self.name}{_format_labels(labels)} {value}")
+                continue
+
+            cumulative = 0
+            for bound, count in zip(value.bounds, value.counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(labels, ('le', str(bound)))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(labels, ('le', '+Inf'))} {value.count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {value.total}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {value.count}")
+
+        return lines
+
+    def as_dict(self) -> Dict:
+        return {
+            ",".join(f"{k}={v}" for k, v in labels) or "": value.as_dict() if self.kind == "histogram" else value
+            for labels, value in sorted(self.samples.items())
+        }
+
+
+class _BusyRatio:
+    """
+    Busy ratio of each worker since the previous collection, from the workers' busy_ns / busy_since_ns
+    """
+
+    def __init__(self):
+        self._last: Dict[int, Tuple[int, int]] = {}  # id(worker) -> (collected_ns, busy_ns)
+
+    def __call__(self, worker: QObject, now: int) -> Tuple[float, float]:
+        """
+        :return: (busy seconds in total, busy ratio since the last call)
+        """
+        busy_ns = worker.busy_ns + (now - worker.busy_since_ns if worker.busy_since_ns else 0)  # job in flight
+        last_ns, last_busy_ns = self._last.get(id(worker), (now, busy_ns))
+        self._last[id(worker)] = (now, busy_ns)
+
+        ratio = (busy_ns - last_busy_ns) / (now - last_ns) if now > last_ns else 0.0
+        return busy_ns / 1e9, min(1.0, max(0.0, ratio))
+
+
+class MetricsRegistry(QObject):
+    """
+    Create it on the GUI thread, watch_*() whatever should be exported, then start() the collection timer.
+    """
+
+    def __init__(self, interval_ms: int = 1000, parent: Optional[QObject] = None):
+        """
+        :param interval_ms: how often the collectors run
+        """
+        QObject.__init__(self, parent)
+
+        self.metrics: Dict[str, Metric] = {}
+        self.collectors: List[Callable[[], None]] = []
+        self.collected_at = 0.0  # wall clock time of the last collection
+
+        self._lock = threading.Lock()  # the server thread renders while the GUI thread collects
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.collect)
+
+    def start(self):
+        self.collect()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def _metric(self, name: str, kind: str, help_text: str, **kwargs) -> Metric:
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = Metric(name, kind, help_text, **kwargs)
+        elif metric.kind != kind:
+            raise ValueError(f"{name} is already registered as a {metric.kind}")
+        return metric
+
+    def counter(self, name: str, help_text: str) -> Metric:
+        return self._metric(name, "counter", help_text)
+
+    def gauge(self, name: str, help_text: str) -> Metric:
+        return self._metric(name, "gauge", help_text)
+
+    def histogram(self, name: str, help_text: str, bounds: Sequence[float] = BUCKETS_MS) -> Metric:
+        return self._metric(name, "histogram", help_text, bounds=bounds)
+
+    def add_collector(self, collector: Callable[[], None]):
+        """
+        :param collector: called on the GUI thread every interval to refresh metrics
+        """
+        self.collectors.append(collector)
+
+    @pyqtSlot()
+    def collect(self):
+        with self._lock:
+            for collector in self.collectors:
+                try:
+                    collector()
+                except Exception:
+                    logger.exception("metrics collector %r failed", collector)
+            self.collected_at = time.time()
+
+    def watch_service(self, service: QObject, name: str = "service"):
+        """
+        Export a WorkerService: threads, queue depth, outstanding jobs, per thread busy ratio and the wait / run
+        time of every job finished since the last collection (up to the service's 4096 entry logs)
+        """
+        threads = self.gauge("qthreads_threads", "Worker threads owned")
+        depth = self.gauge("qthreads_queue_depth", "Jobs queued and not yet picked up by a worker")
+        outstanding = self.gauge("qthreads_jobs_outstanding", "Jobs submitted and not yet finished")
+        busy_total = self.counter("qthreads_worker_busy_seconds_total", "Time each worker thread spent running jobs")
+        busy_ratio = self.gauge("qthreads_worker_busy_ratio", "Fraction of the last interval spent running jobs")
+        wait_ms = self.histogram("qthreads_job_wait_ms", "Time jobs spent queued before a worker picked them up")
+        run_ms = self.histogram("qthreads_job_run_ms", "Time jobs spent running")
+
+        busy = _BusyRatio()
+        cursor = {"waits": time.monotonic_ns(), "runs": time.monotonic_ns()}  # only count entries newer than this
+
+        def read_log(log, key: str, hist: Histogram):
+            entries = [entry for entry in list(log) if entry[0] > cursor[key]]
+            for _, elapsed_ns in entries:
+                hist.add(elapsed_ns / 1e6)
+            if entries:
+                cursor[key] = max(entry[0] for entry in entries)
+
+        def collect():
+            if sip.isdeleted(service):
+                return
+            now = time.monotonic_ns()
+
+            threads.set(service.thread_count, owner=name)
+            depth.set(service.jobs.qsize(), owner=name)
+            outstanding.set(service.outstanding, owner=name)
+
+            for thread, worker in zip(list(service.threads), list(service.workers)):
+                seconds, ratio = busy(worker, now)
+                busy_total.set(seconds, owner=name, thread=thread.objectName())
+                busy_ratio.set(ratio, owner=name, thread=thread.objectName())
+
+            read_log(service.waits_ns, "waits", wait_ms.histogram(owner=name))
+            read_log(service.runs_ns, "runs", run_ms.histogram(owner=name))
+
+        self.add_collector(collect)
+
+    def watch_pool(self, pool: QObject, name: str = "pool"):
+        """
+        Export a WorkerPool: jobs queued on each worker's event loop and per thread busy ratio
+        """
+        threads = self.gauge("qthreads_threads", "Worker threads owned")
+        queued = self.gauge("qthreads_queued_events", "Queued slot calls waiting on a worker thread's event loop")
+        busy_total = self.counter("qthreads_worker_busy_seconds_total", "Time each worker thread spent running jobs")
+        busy_ratio = self.gauge("qthreads_worker_busy_ratio", "Fraction of the last interval spent running jobs")
+
+        busy = _BusyRatio()
+
+        def collect():
+            if sip.isdeleted(pool):
+                return
+            now = time.monotonic_ns()
+
+            threads.set(len(pool.threads), owner=name)
+            for thread, worker in zip(pool.threads, pool.workers):
+                if sip.isdeleted(worker):  # stopped
+                    continue
+                seconds, ratio = busy(worker, now)
+                label = thread.objectName()
+                queued.set(pool.queued(worker.index), owner=name, thread=label)
+                busy_total.set(seconds, owner=name, thread=label)
+                busy_ratio.set(ratio, owner=name, thread=label)
+
+        self.add_collector(collect)
+
+    def watch_watchdog(self, watchdog: QObject):
+        """
+        Export a StallWatchdog's heartbeat lag and stall histograms
+        """
+        self.histogram("qthreads_gui_heartbeat_lag_ms", "How late each GUI thread heartbeat fired").attach(
+            watchdog.lag_ms)
+        self.histogram("qthreads_gui_stall_ms", "Length of every GUI thread stall").attach(watchdog.stall_ms)
+
+    def watch_profiler(self, profiler):
+        """
+        Export a SlotProfiler: calls, time and latency of every profiled slot per thread
+        """
+        calls = self.counter("qthreads_slot_calls_total", "Profiled slot calls")
+        seconds = self.counter("qthreads_slot_seconds_total", "Time spent in profiled slots")
+        over = self.counter("qthreads_slot_over_budget_total", "GUI thread slot calls over the frame budget")
+        latency = self.histogram("qthreads_slot_latency_ms", "Profiled slot latency")
+
+        def collect():
+            for stats in list(profiler.stats.values()):
+                calls.set(stats.calls, slot=stats.slot, thread=stats.thread)
+                seconds.set(stats.latency_ms.total / 1e3, slot=stats.slot, thread=stats.thread)
+                over.set(stats.over_budget, slot=stats.slot, thread=stats.thread)
+                latency.attach(stats.latency_ms, slot=stats.slot, thread=stats.thread)
+
+        self.add_collector(collect)
+
+    def watch_coordinator(self, coordinator: QObject, name: str = "window"):
+        """
+        Export how many of a ShutdownCoordinator's tracked threads are running, covers the examples' Workers
+        """
+        running = self.gauge("qthreads_threads_running", "Tracked worker threads currently running")
+
+        def collect():
+            if not sip.isdeleted(coordinator):
+                running.set(coordinator.running(), owner=name)
+
+        self.add_collector(collect)
+
+    def prometheus_text(self) -> str:
+        with self._lock:
+            lines = [line for metric in self.metrics.values() for line in metric.prometheus_lines()]
+            lines += ["# HELP qthreads_metrics_collected_timestamp_seconds When the collectors last ran, goes "
+                      "stale while the GUI thread is blocked",
+                      "# TYPE qthreads_metrics_collected_timestamp_seconds gauge",
+                      f"qthreads_metrics_collected_timestamp_seconds {self.collected_at}"]
+        return "\n".join(lines) + "\n"
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            metrics = {name: metric.as_dict() for name, metric in self.metrics.items()}
+        return {"collected_at": self.collected_at, "metrics": metrics}
+
+    def dump_json(self, path: str):
+        """
+        Collect once more and write every metric to path
+        """
+        self.collect()
+        with open(path, "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
+        logger.info("metrics written to %s", path)
+
+
+class MetricsServer:
+    """
+    Serves a MetricsRegistry on /metrics (Prometheus text) and /metrics.json from a daemon thread.
+    """
+
+    def __init__(self, registry: MetricsRegistry, port: int = 9464, host: str = "127.0.0.1"):
+        """
+        :param port: 0 picks a free port, see .port once started
+        :param host: loopback by default, the endpoint is not authenticated
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path == "/metrics":
+                    body = registry.prometheus_text().encode()
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                elif path == "/metrics.json":
+                    body = json.dumps(registry.as_dict()).encode()
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                logger.debug(fmt, *args)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        logger.info("metrics served on http://%s:%d/metrics", self.host, self.port)
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = self._thread = None
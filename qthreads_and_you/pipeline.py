@@ -0,0 +1,338 @@
+"""
+Multi stage streaming pipeline
+
+Author: Ben Sutton
+Description: The examples only ever have one worker reporting to ExampleWindow, so a decode -> transform ->
+aggregate job runs each step after the other inside a single run_it.  Pipeline gives every Stage its own workers,
+each a Worker(QObject) on its own QThread, and streams items from one stage to the next by emitting queued
+signals straight into the next stage's worker.  A stage only takes `buffer` items at a time, an upstream worker
+blocks once the stage after it is full, so a slow stage holds the rest back instead of its event queue growing
+without bound.  Each stage counts its items, busy time and the time it spent blocked on the next stage.
+
+    total = Sum()  # __call__ adds an item, result() returns the sum
+    pipeline = Pipeline([Stage(decode), Stage(transform, workers=4), Stage(total, finish=total.result)])
+    pipeline.sig_output.connect(self.on_output)
+    pipeline.run(paths)
+
+A stage function returns one item for the next stage, None to send nothing on (filters, aggregates), or is a
+generator and yields any number of them.  A Pipeline runs once, create another for the next batch.
+
+"""
+
+import inspect
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from PyQt5.QtCore import Qt, QCoreApplication, QObject, QThread, pyqtSignal, pyqtSlot
+
+logger = logging.getLogger(__name__)
+
+
+class Stage:
+    """
+    One step of a Pipeline.
+    """
+
+    def __init__(self, fn: Callable[[object], object], workers: int = 1, buffer: int = 64, name: Optional[str] = None,
+                 finish: Optional[Callable[[], object]] = None):
+        """
+        :param fn: called with each item on one of the stage's worker threads
+        :param workers: worker threads for this stage, items go to the least loaded one
+        :param buffer: items the stage holds at once, queued or running, before upstream blocks
+        :param name: used in stats and failures, defaults to fn's name
+        :param finish: called once per worker after the last item, its result is sent on like fn's (aggregates)
+        """
+        self.fn = fn
+        self.workers = workers
+        self.buffer = buffer
+        self.name = name or getattr(fn, "__name__", type(fn).__name__)
+        self.finish = finish
+
+        self.runners: List["StageWorker"] = []
+        self.downstream = None  # the next Stage, or the Pipeline's output
+
+        self._slots = threading.Semaphore(buffer)
+        self._lock = threading.Lock()
+        self._producers = 1  # upstream workers still sending, set by Pipeline
+        self.buffered = 0
+        self.max_buffered = 0
+        self.first_ns = 0
+        self.end_ns = 0
+
+    def send(self, item: object, cancelled: threading.Event) -> int:
+        """
+        Hand item to the least loaded worker, blocks while the stage is full.  Safe to call from any thread.
+        :return: ns spent blocked
+        """
+        start = time.monotonic_ns()
+        while not self._slots.acquire(timeout=0.05):
+            if cancelled.is_set():
+                return time.monotonic_ns() - start
+        blocked_ns = time.monotonic_ns() - start
+
+        if cancelled.is_set():  # stop() may have let the runners' threads go already
+            self._slots.release()
+            return blocked_ns
+
+        with self._lock:
+            self.buffered += 1
+            self.max_buffered = max(self.max_buffered, self.buffered)
+            if not self.first_ns:
+                self.first_ns = time.monotonic_ns()
+            runner = min(self.runners, key=lambda r: r.pending)
+            runner.pending += 1
+
+        runner.sig_item.emit(item)  # queued onto the runner's thread
+        return blocked_ns
+
+    def _taken(self, runner: "StageWorker"):
+        with self._lock:
+            self.buffered -= 1
+            runner.pending -= 1
+        self._slots.release()
+
+    def producer_done(self):
+        """
+        One upstream worker has sent its last item, once all of them have the stage's workers are ended
+        """
+        with self._lock:
+            self._producers -= 1
+            last = not self._producers
+
+        if last and not self.runners[0].cancelled.is_set():
+            for runner in self.runners:
+                runner.sig_end.emit()  # queued behind every item already sent
+
+    def stats(self) -> Dict:
+        items_in = sum(r.items_in for r in self.runners)
+        busy_ns = sum(r.busy_ns for r in self.runners)
+        elapsed_ns = (self.end_ns or time.monotonic_ns()) - self.first_ns if self.first_ns else 0
+        return {
+            "workers": self.workers,
+            "items_in": items_in,
+            "items_out": sum(r.items_out for r in self.runners),
+            "failed": sum(r.failed for r in self.runners),
+            "items_per_s": items_in / (elapsed_ns / 1e9) if elapsed_ns else 0.0,
+            "busy_s": busy_ns / 1e9,
+            "blocked_s": sum(r.blocked_ns for r in self.runners) / 1e9,
+            "utilisation": busy_ns / (elapsed_ns * self.workers) if elapsed_ns else 0.0,
+            "max_buffered": self.max_buffered,
+            "buffer": self.buffer,
+        }
+
+
+class StageWorker(QObject):
+    """
+    Runs one Stage's fn for the items it is sent, lives on its own QThread.
+    """
+    sig_item = pyqtSignal(object)  # emitted by upstream, runs on_item on this worker's thread
+    sig_end = pyqtSignal()  # no more items
+    sig_failed = pyqtSignal(str, object)  # stage name, exception
+
+    def __init__(self, stage: Stage, cancelled: threading.Event):
+        QObject.__init__(self)
+
+        self.stage = stage
+        self.cancelled = cancelled
+
+        self.pending = 0  # sent and not yet taken, guarded by the stage's lock
+        self.items_in = 0
+        self.items_out = 0
+        self.failed = 0
+        self.busy_ns = 0
+        self.blocked_ns = 0
+
+        self.sig_item.connect(self.on_item, Qt.QueuedConnection)
+        self.sig_end.connect(self.on_end, Qt.QueuedConnection)
+
+    def _forward(self, result: object):
+        items = result if inspect.isgenerator(result) else (result,)
+        for item in items:
+            if item is None:
+                continue
+            if self.cancelled.is_set():
+                return
+            self.blocked_ns += self.stage.downstream.send(item, self.cancelled)
+            self.items_out += 1
+
+    def _run(self, fn: Callable, *args):
+        start, blocked = time.monotonic_ns(), self.blocked_ns
+        try:
+            self._forward(fn(*args))
+        except Exception as e:
+            self.failed += 1
+            self.sig_failed.emit(self.stage.name, e)
+        finally:
+            self.busy_ns += time.monotonic_ns() - start - (self.blocked_ns - blocked)
+
+    @pyqtSlot(object)
+    def on_item(self, item: object):
+        try:
+            self.items_in += 1
+            if not self.cancelled.is_set():
+                self._run(self.stage.fn, item)
+        finally:
+            self.stage._taken(self)
+
+    @pyqtSlot()
+    def on_end(self):
+        if self.stage.finish is not None and not self.cancelled.is_set():
+            self._run(self.stage.finish)
+
+        self.stage.end_ns = time.monotonic_ns()
+        self.stage.downstream.producer_done()
+        QThread.currentThread().quit()  # nothing more will arrive
+
+
+class _Source(QObject):
+    sig_source_done = pyqtSignal()
+
+    def __init__(self, items: Iterable, first: Stage, cancelled: threading.Event):
+        QObject.__init__(self)
+
+        self.items = items
+        self.first = first
+        self.cancelled = cancelled
+
+    @pyqtSlot()
+    def run_it(self):
+        try:
+            for item in self.items:
+                if self.cancelled.is_set():
+                    break
+                self.first.send(item, self.cancelled)
+        finally:
+            self.first.producer_done()
+            self.sig_source_done.emit()
+
+
+class Pipeline(QObject):
+    """
+    Create it on the GUI thread, then either run(iterable) or start() and put() / close() by hand.
+    """
+    sig_output = pyqtSignal(object)  # every item out of the last stage
+    sig_failed = pyqtSignal(str, object)  # stage name, exception, the item is dropped and the stream carries on
+    sig_finished = pyqtSignal(dict)  # per stage stats, once the last stage has ended
+
+    _sig_end = pyqtSignal()
+
+    def __init__(self, stages: List[Stage], parent: Optional[QObject] = None):
+        QObject.__init__(self, parent)
+
+        if not stages:
+            raise ValueError("a Pipeline needs at least one Stage")
+
+        self.stages = stages
+        self.cancelled = threading.Event()
+
+        self.threads: List[QThread] = []
+        self.running = False
+        self.finished = False
+        self._start_ns = 0
+        self._source: Optional[_Source] = None
+        self._producers = stages[-1].workers  # last stage workers still to end
+        self._lock = threading.Lock()
+
+        upstream_workers = 1  # the source, run() or put() / close()
+        for stage, downstream in zip(stages, itertools.chain(stages[1:], [self])):
+            stage.downstream = downstream
+            stage._producers = upstream_workers
+            upstream_workers = stage.workers
+
+            for index in range(stage.workers):
+                worker = StageWorker(stage, self.cancelled)
+                self._add_thread(worker, f"pipeline-{stage.name}-{index}")
+                worker.sig_failed.connect(self.sig_failed)
+                stage.runners.append(worker)
+
+        self._sig_end.connect(self.on_end)
+
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop)
+
+    def _add_thread(self, worker: QObject, name: str) -> QThread:
+        thread = QThread(self)
+        thread.setObjectName(name)
+
+        worker.moveToThread(thread)  # no deleteLater, other stages' threads may still emit to it, Python owns it
+        self.threads.append(thread)
+        return thread
+
+    # the last stage sends on to the pipeline itself
+    def send(self, item: object, cancelled: threading.Event) -> int:
+        self.sig_output.emit(item)
+        return 0
+
+    def producer_done(self):
+        with self._lock:  # the last stage's workers end on their own threads
+            self._producers -= 1
+            last = not self._producers
+
+        if last:
+            self._sig_end.emit()
+
+    @pyqtSlot()
+    def on_end(self):
+        self.finished = True
+        report = self.stats()
+        logger.info("pipeline finished in %.3f s: %s", report["elapsed_s"], ", ".join(
+            f"{name} {s['items_per_s']:.0f} items/s" for name, s in report["stages"].items()))
+        self.sig_finished.emit(report)
+
+    def start(self):
+        self.running = True
+        self._start_ns = time.monotonic_ns()
+
+        for thread in self.threads:
+            thread.start()
+
+    def run(self, items: Iterable):
+        """
+        Start the pipeline and feed it items from a source thread, the GUI thread never blocks on a full stage
+        """
+        self._source = _Source(items, self.stages[0], self.cancelled)
+        thread = self._add_thread(self._source, "pipeline-source")
+        self._source.sig_source_done.connect(thread.quit, Qt.DirectConnection)
+        thread.started.connect(self._source.run_it)
+
+        self.start()
+
+    def put(self, item: object):
+        """
+        Feed one item, blocks while the first stage is full, so keep it off the GUI thread when that matters
+        """
+        self.stages[0].send(item, self.cancelled)
+
+    def close(self):
+        """
+        No more put()s, the stages end once they have drained
+        """
+        self.stages[0].producer_done()
+
+    def stats(self) -> Dict:
+        return {
+            "elapsed_s": (time.monotonic_ns() - self._start_ns) / 1e9 if self._start_ns else 0.0,
+            "stages": {stage.name: stage.stats() for stage in self.stages},
+        }
+
+    @pyqtSlot()
+    def stop(self, wait: bool = True):
+        """
+        Drop whatever is still in flight and stop every thread
+        :param wait: block until every thread has exited
+        """
+        if not self.running:
+            return
+        self.running = False
+        self.cancelled.set()
+
+        for thread in self.threads:
+            thread.quit()
+
+        if wait:
+            for thread in self.threads:
+                thread.wait()
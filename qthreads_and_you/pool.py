@@ -0,0 +1,155 @@
+"""
+Worker pool for the QObject / moveToThread pattern
+
+Author: Ben Sutton
+Description: Example 3 and 4 pair exactly one Worker(QObject) with one QThread, so every queued slot call
+waits behind whatever that single thread is already doing.  WorkerPool owns N of those pairs and hands each
+submitted job to the least loaded worker.
+
+"""
+
+import itertools
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+from PyQt5.QtCore import Qt, QObject, QThread, pyqtSignal, pyqtSlot
+
+
+class PoolWorker(QObject):
+    """
+    One Worker(QObject) of the pool, lives on its own QThread once moved there.
+    """
+    sig_submit = pyqtSignal(int, object, object, object)  # job_id, fn, args, kwargs
+    sig_job_done = pyqtSignal(int, object)  # job_id, result
+    sig_job_failed = pyqtSignal(int, object)  # job_id, exception
+
+    def __init__(self, index: int):
+        QObject.__init__(self)
+
+        self.index = index
+        self.busy_since_ns = 0  # 0 while idle
+        self.busy_ns = 0  # total time spent running jobs
+
+        # always queued, so emitting from the GUI thread lands the call on this worker's thread
+        self.sig_submit.connect(self.run_job, Qt.QueuedConnection)
+
+    @pyqtSlot(int, object, object, object)
+    def run_job(self, job_id: int, fn: Callable, args: tuple, kwargs: dict):
+        self.busy_since_ns = time.monotonic_ns()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.sig_job_failed.emit(job_id, e)
+        else:
+            self.sig_job_done.emit(job_id, result)
+        finally:
+            self.busy_ns += time.monotonic_ns() - self.busy_since_ns
+            self.busy_since_ns = 0
+
+
+class WorkerPool(QObject):
+    """
+    N PoolWorkers on N QThreads, jobs are dispatched to the worker with the fewest outstanding jobs.
+
+    The pool itself must live on the GUI thread, its completion signals are emitted there.
+    """
+    sig_job_done = pyqtSignal(int, object)  # job_id, result
+    sig_job_failed = pyqtSignal(int, object)  # job_id, exception
+    sig_worker_done = pyqtSignal()  # every submitted job has finished
+
+    def __init__(self, size: Optional[int] = None, parent: Optional[QObject] = None):
+        QObject.__init__(self, parent)
+
+        self.size = size or os.cpu_count() or 1
+
+        self._job_ids = itertools.count(1)
+        self._job_worker: Dict[int, int] = {}  # job_id -> worker index
+        self._pending: List[int] = [0] * self.size  # outstanding jobs per worker
+
+        self.threads: List[QThread] = []
+        self.workers: List[PoolWorker] = []
+
+        for index in range(self.size):
+            thread = QThread(self)
+            thread.setObjectName(f"pool-worker-{index}")
+
+            worker = PoolWorker(index)
+            worker.moveToThread(thread)
+
+            worker.sig_job_done.connect(self.on_job_done)
+            worker.sig_job_failed.connect(self.on_job_failed)
+            thread.finished.connect(worker.deleteLater)
+
+            self.threads.append(thread)
+            self.workers.append(worker)
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of submitted jobs that have not yet finished
+        """
+        return sum(self._pending)
+
+    def running(self, index: int) -> int:
+        """
+        Jobs worker `index` is running right now, 0 or 1
+        """
+        return 1 if self.workers[index].busy_since_ns else 0
+
+    def queued(self, index: int) -> int:
+        """
+        Jobs waiting on worker `index`'s event loop, not counting the one it is running
+        """
+        return max(0, self._pending[index] - self.running(index))
+
+    def start(self):
+        """
+        Start every worker thread
+        """
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self, wait: bool = True):
+        """
+        Quit every worker thread, jobs already queued on a worker are abandoned
+        :param wait: block until every thread has exited
+        """
+        for thread in self.threads:
+            thread.quit()
+
+        if wait:
+            for thread in self.threads:
+                thread.wait()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> int:
+        """
+        Queue fn(*args, **kwargs) on the least loaded worker
+        :param fn: callable to run on a worker thread
+        :return: job id reported back by sig_job_done / sig_job_failed
+        """
+        job_id = next(self._job_ids)
+        index = min(range(self.size), key=self._pending.__getitem__)
+
+        self._pending[index] += 1
+        self._job_worker[job_id] = index
+
+        self.workers[index].sig_submit.emit(job_id, fn, args, kwargs)
+
+        return job_id
+
+    def _complete(self, job_id: int):
+        self._pending[self._job_worker.pop(job_id)] -= 1
+
+        if not self.pending:
+            self.sig_worker_done.emit()
+
+    @pyqtSlot(int, object)
+    def on_job_done(self, job_id: int, result: object):
+        self.sig_job_done.emit(job_id, result)
+        self._complete(job_id)
+
+    @pyqtSlot(int, object)
+    def on_job_failed(self, job_id: int, error: object):
+        self.sig_job_failed.emit(job_id, error)
+        self._complete(job_id)
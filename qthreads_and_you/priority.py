@@ -0,0 +1,114 @@
+"""
+Priority aware call dispatch on a worker thread
+
+Author: Ben Sutton
+Description: As example 4 points out, mult_affinity queues BEHIND run_it, the worker's event loop is FIFO.
+PriorityDispatcher lives on the worker thread and keeps its own priority queue of calls.  It runs one call per
+pass of the worker's event loop, highest priority first, so other queued events still get through.  Long jobs
+submitted with call_units() are broken into units that go back into the queue after each one, so a HIGH call
+made in the middle of one runs before the next unit.
+
+"""
+
+import enum
+import heapq
+import itertools
+import threading
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from PyQt5.QtCore import Qt, QObject, pyqtSignal, pyqtSlot
+
+
+class Priority(enum.IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+class PriorityDispatcher(QObject):
+    """
+    moveToThread() it onto a worker QThread, call() / call_units() are safe from any thread.
+    """
+    sig_call_done = pyqtSignal(int, object)  # call_id, result (list of unit results for call_units)
+    sig_call_failed = pyqtSignal(int, object)  # call_id, exception
+    sig_worker_done = pyqtSignal()  # the queue has run dry
+
+    sig_wake = pyqtSignal()  # internal, one queued event per pending dispatch pass
+
+    def __init__(self, parent: Optional[QObject] = None):
+        QObject.__init__(self, parent)
+
+        self._lock = threading.Lock()
+        self._heap: List[Tuple] = []  # (priority, seq, call_id, fn, args, kwargs, units, results)
+        self._seq = itertools.count()
+        self._call_ids = itertools.count(1)
+        self._wake_pending = False
+
+        self.sig_wake.connect(self.dispatch, Qt.QueuedConnection)
+
+    @property
+    def pending(self) -> int:
+        return len(self._heap)
+
+    def call(self, fn: Callable, *args, priority: Priority = Priority.NORMAL, **kwargs) -> int:
+        """
+        Queue fn(*args, **kwargs) on the dispatcher's thread
+        :return: call id reported back by sig_call_done / sig_call_failed
+        """
+        call_id = next(self._call_ids)
+        self._push((priority, next(self._seq), call_id, fn, args, kwargs, None, None))
+        return call_id
+
+    def call_units(self, units: Iterable[Callable[[], object]], priority: Priority = Priority.BACKGROUND) -> int:
+        """
+        Queue a long job as a series of zero argument callables, run one per dispatch pass
+        :return: call id, sig_call_done carries the list of unit results
+        """
+        call_id = next(self._call_ids)
+        self._push((priority, next(self._seq), call_id, None, (), {}, iter(units), []))
+        return call_id
+
+    def _push(self, entry: Tuple):
+        with self._lock:
+            heapq.heappush(self._heap, entry)
+            wake = not self._wake_pending
+            self._wake_pending = True
+
+        if wake:
+            self.sig_wake.emit()
+
+    @pyqtSlot()
+    def dispatch(self):
+        """
+        Run the single highest priority call, or the next unit of one
+        """
+        with self._lock:
+            if not self._heap:
+                self._wake_pending = False
+                return
+            entry = heapq.heappop(self._heap)
+
+        priority, seq, call_id, fn, args, kwargs, units, results = entry
+
+        try:
+            if units is None:
+                self.sig_call_done.emit(call_id, fn(*args, **kwargs))
+            else:
+                unit = next(units, None)
+                if unit is None:
+                    self.sig_call_done.emit(call_id, results)
+                else:
+                    results.append(unit())
+                    with self._lock:  # same seq, keeps its place among equal priority calls
+                        heapq.heappush(self._heap, entry)
+        except Exception as e:
+            self.sig_call_failed.emit(call_id, e)
+
+        with self._lock:
+            more = bool(self._heap)
+            self._wake_pending = more
+
+        if more:
+            self.sig_wake.emit()  # back of the Qt queue, so other events run between calls
+        else:
+            self.sig_worker_done.emit()
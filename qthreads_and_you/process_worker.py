@@ -0,0 +1,99 @@
+"""
+Process pool backed Worker
+
+Author: Ben Sutton
+Description: run() / run_it() in the examples stand in for a large processing load, but pure Python number
+crunching on a QThread still holds the GIL and starves the GUI thread.  ProcessWorker keeps the Worker signal
+API (sig_job_done, sig_worker_done, finished) while the jobs themselves run in a ProcessPoolExecutor.  Results
+come back on the thread the ProcessWorker lives on, normally the GUI thread.
+
+Jobs are pickled across to the child processes, so fn must be a module level function and its arguments
+and result picklable.
+
+"""
+
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from typing import Callable, Optional, Set
+
+from PyQt5.QtCore import Qt, QObject, pyqtSignal, pyqtSlot
+
+
+class ProcessWorker(QObject):
+    """
+    Worker whose jobs run in child processes, signals are delivered on the worker's own thread.
+    """
+    sig_job_done = pyqtSignal(int, object)  # job_id, result
+    sig_job_failed = pyqtSignal(int, object)  # job_id, exception
+    sig_worker_done = pyqtSignal()  # every submitted job has finished, been cancelled by shutdown() or failed
+    finished = pyqtSignal()  # the process pool has been shut down
+
+    sig_submit = pyqtSignal(object, object, object)  # fn, args, kwargs, for the examples' queued slot style
+    _sig_complete = pyqtSignal(int, object)  # internal, job_id, finished Future, from the executor's thread
+
+    def __init__(self, processes: Optional[int] = None, start_method: str = "spawn", parent: Optional[QObject] = None):
+        """
+        :param processes: pool size, defaults to os.cpu_count()
+        :param start_method: multiprocessing start method, spawn avoids forking a process that has Qt threads
+        """
+        QObject.__init__(self, parent)
+
+        self.processes = processes or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context(start_method))
+
+        self._job_ids = itertools.count(1)
+        self._pending: Set[int] = set()
+
+        self.sig_submit.connect(self.run_job)
+        self._sig_complete.connect(self.on_complete, Qt.QueuedConnection)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> int:
+        """
+        Run fn(*args, **kwargs) in the process pool
+        :return: job id reported back by sig_job_done / sig_job_failed
+        """
+        job_id = next(self._job_ids)
+        self._submit(job_id, fn, args, kwargs)
+        return job_id
+
+    def _submit(self, job_id: int, fn: Callable, args: tuple, kwargs: dict):
+        future = self.executor.submit(fn, *args, **kwargs)  # RuntimeError after shutdown(), nothing recorded then
+        self._pending.add(job_id)
+        future.add_done_callback(lambda f: self._sig_complete.emit(job_id, f))
+
+    @pyqtSlot(object, object, object)
+    def run_job(self, fn: Callable, args: tuple, kwargs: dict):
+        job_id = next(self._job_ids)
+        try:
+            self._submit(job_id, fn, args, kwargs)
+        except Exception as e:  # an exception escaping a slot aborts the process
+            self.sig_job_failed.emit(job_id, e)
+
+    @pyqtSlot(int, object)
+    def on_complete(self, job_id: int, future: Future):
+        self._pending.discard(job_id)
+
+        if future.cancelled():  # queued when shutdown() cancelled it, exception() would raise CancelledError
+            self.sig_job_failed.emit(job_id, CancelledError())
+        elif future.exception() is None:
+            self.sig_job_done.emit(job_id, future.result())
+        else:
+            self.sig_job_failed.emit(job_id, future.exception())
+
+        if not self._pending:
+            self.sig_worker_done.emit()
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop accepting jobs and shut the process pool down
+        :param wait: block until running jobs finish, queued jobs that have not started are cancelled and reported
+        through sig_job_failed with a CancelledError
+        """
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+        self.finished.emit()
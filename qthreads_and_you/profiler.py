@@ -0,0 +1,141 @@
+"""
+Per slot execution time profiler
+
+Author: Ben Sutton
+Description: The examples mark their handlers with @pyqtSlot but nothing says how long each one takes or which
+thread it ran on.  Subclasses of the ProfiledSlots mixin get every @pyqtSlot method wrapped, profiled() does a
+single function, so each call records a count and a latency histogram per slot per thread.  Calls that run on
+the GUI thread for longer than the budget are flagged.  Recording is off until enabled with SlotProfiler.enable() or by setting
+QTHREADS_PROFILE_SLOTS=1, and a disabled wrapper costs one attribute check.
+
+"""
+
+import functools
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from qthreads_and_you.stats import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class SlotStats:
+    __slots__ = ("slot", "thread", "calls", "latency_ms", "over_budget")
+
+    def __init__(self, slot: str, thread: str):
+        self.slot = slot
+        self.thread = thread
+        self.calls = 0
+        self.latency_ms = Histogram()
+        self.over_budget = 0
+
+
+class SlotProfiler:
+    """
+    Collects SlotStats keyed by (slot, thread id), each entry is only written by its own thread.
+    """
+
+    def __init__(self, gui_budget_ms: float = 16.0, enabled: bool = False):
+        """
+        :param gui_budget_ms: GUI thread calls longer than this are flagged, one frame at 60 Hz by default
+        """
+        self.gui_budget_ms = gui_budget_ms
+        self.enabled = enabled
+
+        self.gui_ident = threading.main_thread().ident
+        self.stats: Dict[Tuple[str, int], SlotStats] = {}
+        self._flagged: Set[str] = set()  # slots already logged as over budget
+
+    def enable(self, gui_budget_ms: Optional[float] = None):
+        if gui_budget_ms is not None:
+            self.gui_budget_ms = gui_budget_ms
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def record(self, slot: str, elapsed_ns: int):
+        ident = threading.get_ident()
+        key = (slot, ident)
+
+        stats = self.stats.get(key)
+        if stats is None:
+            name = "GUI" if ident == self.gui_ident else threading.current_thread().name
+            stats = self.stats.setdefault(key, SlotStats(slot, f"{name} ({threading.get_native_id()})"))
+
+        elapsed_ms = elapsed_ns / 1e6
+        stats.calls += 1
+        stats.latency_ms.add(elapsed_ms)
+
+        if ident == self.gui_ident and elapsed_ms > self.gui_budget_ms:
+            stats.over_budget += 1
+            if slot not in self._flagged:
+                self._flagged.add(slot)
+                logger.warning("slot %s ran on the GUI thread for %.1f ms, budget is %.1f ms",
+                               slot, elapsed_ms, self.gui_budget_ms)
+
+    def report(self) -> Dict:
+        return {
+            f"{stats.slot} @ {stats.thread}": {
+                "calls": stats.calls,
+                "over_budget": stats.over_budget,
+                "latency_ms": stats.latency_ms.as_dict(),
+            }
+            for stats in list(self.stats.values())
+        }
+
+    def log_report(self):
+        for stats in sorted(list(self.stats.values()), key=lambda s: -s.latency_ms.total):
+            logger.info("%s on %s: %d calls, %.2f ms total, %.2f ms max, %d over budget | %s",
+                        stats.slot, stats.thread, stats.calls, stats.latency_ms.total, stats.latency_ms.max,
+                        stats.over_budget, stats.latency_ms)
+
+
+slot_profiler = SlotProfiler(enabled=bool(os.environ.get("QTHREADS_PROFILE_SLOTS")))
+
+
+def profiled(fn: Callable, name: Optional[str] = None) -> Callable:
+    """
+    Wrap one function, put it under @pyqtSlot so the slot signature is kept
+    """
+    slot = name or fn.__qualname__
+    perf_counter_ns = time.perf_counter_ns
+
+    @functools.wraps(fn)  # also carries over __pyqtSignature__
+    def wrapper(*args, **kwargs):
+        if not slot_profiler.enabled:
+            return fn(*args, **kwargs)
+
+        start_ns = perf_counter_ns()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            slot_profiler.record(slot, perf_counter_ns() - start_ns)
+
+    wrapper.__profiled__ = True
+    return wrapper
+
+
+def profile_slots(cls: type) -> type:
+    """
+    Wrap every method the class itself defines with @pyqtSlot.  PyQt builds a class's slot table while the class
+    is being created, so this only takes effect from __init_subclass__ (see ProfiledSlots), not as a decorator.
+    """
+    for attr, value in list(vars(cls).items()):
+        if callable(value) and hasattr(value, "__pyqtSignature__") and not getattr(value, "__profiled__", False):
+            setattr(cls, attr, profiled(value))
+
+    return cls
+
+
+class ProfiledSlots:
+    """
+    Mixin, every @pyqtSlot of a subclass is profiled: class Worker(ProfiledSlots, QObject)
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        profile_slots(cls)
@@ -0,0 +1,277 @@
+"""
+Persistent worker service with a job queue
+
+Author: Ben Sutton
+Description: Example 3 and 4 deleteLater their worker and worker_thread after a single run_it, so any further work
+means building and tearing down another QThread.  WorkerService keeps its worker threads warm for the life of the
+app: jobs (a callable plus arguments) go onto a queue, the workers run them back to back and report each one
+through signals.  The threads are only torn down by shutdown(), which is hooked to QCoreApplication.aboutToQuit.
+
+"""
+
+import collections
+import functools
+import itertools
+import queue
+import threading
+import time
+from typing import Callable, Deque, List, Optional, Tuple
+
+from PyQt5.QtCore import Qt, QCoreApplication, QObject, QThread, pyqtSignal, pyqtSlot
+
+from qthreads_and_you.bounded import BoundedJobQueue, JobDropped
+
+
+class Job:
+    """
+    One queued call.
+    """
+    __slots__ = ("job_id", "fn", "args", "kwargs", "submitted_ns", "started_ns")
+
+    def __init__(self, job_id: int, fn: Callable, args: tuple, kwargs: dict):
+        self.job_id = job_id
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.submitted_ns = time.monotonic_ns()
+        self.started_ns = 0
+
+    @property
+    def wait_ns(self) -> int:
+        """
+        Time spent queued before a worker picked the job up
+        """
+        return self.started_ns - self.submitted_ns
+
+    def run(self) -> object:
+        return self.fn(*self.args, **self.kwargs)
+
+
+class ServiceWorker(QObject):
+    """
+    Pulls jobs off the shared queue until it is handed the stop sentinel, lives on its own QThread.
+    """
+    sig_job_started = pyqtSignal(int)  # job_id
+    sig_job_done = pyqtSignal(int, object)  # job_id, result
+    sig_job_failed = pyqtSignal(int, object)  # job_id, exception
+    sig_worker_done = pyqtSignal()  # the worker has left its loop
+
+    def __init__(self, jobs: "queue.Queue[Optional[Job]]", waits_ns: Optional[Deque[Tuple[int, int]]] = None,
+                 runs_ns: Optional[Deque[Tuple[int, int]]] = None):
+        """
+        :param jobs: the shared job queue
+        :param waits_ns: where to log (started_ns, wait_ns) for every job
+        :param runs_ns: where to log (finished_ns, run_ns) for every job
+        """
+        QObject.__init__(self)
+
+        self.jobs = jobs
+        self.waits_ns = waits_ns if waits_ns is not None else collections.deque(maxlen=1)
+        self.runs_ns = runs_ns if runs_ns is not None else collections.deque(maxlen=1)
+        self.busy = False
+        self.busy_since_ns = 0
+        self.busy_ns = 0  # total time spent running jobs
+        self.idle_since_ns = time.monotonic_ns()
+
+    @pyqtSlot()
+    def run_it(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:  # stop sentinel
+                break
+
+            job.started_ns = time.monotonic_ns()
+            self.waits_ns.append((job.started_ns, job.wait_ns))
+            self.busy = True
+            self.busy_since_ns = job.started_ns
+            self.sig_job_started.emit(job.job_id)
+
+            try:
+                result = job.run()
+            except Exception as e:
+                self.sig_job_failed.emit(job.job_id, e)
+            else:
+                self.sig_job_done.emit(job.job_id, result)
+            finally:
+                now = time.monotonic_ns()
+                self.busy = False
+                self.busy_since_ns = 0
+                self.busy_ns += now - job.started_ns
+                self.idle_since_ns = now
+                self.runs_ns.append((now, now - job.started_ns))
+
+        self.sig_worker_done.emit()
+
+
+class WorkerService(QObject):
+    """
+    Long lived worker threads fed from one job queue, create it on the GUI thread.
+    """
+    sig_job_started = pyqtSignal(int)  # job_id
+    sig_job_done = pyqtSignal(int, object)  # job_id, result
+    sig_job_failed = pyqtSignal(int, object)  # job_id, exception
+    sig_worker_done = pyqtSignal()  # the queue has drained, every submitted job has finished
+
+    _sig_dropped = pyqtSignal(int, object)  # internal, job_id, JobDropped, delivered once submit() has returned
+
+    def __init__(self, threads: int = 1, jobs: Optional["queue.Queue[Optional[Job]]"] = None,
+                 parent: Optional[QObject] = None):
+        """
+        :param threads: worker threads to keep warm
+        :param jobs: job queue, an unbounded queue.Queue by default or a BoundedJobQueue for backpressure
+        """
+        QObject.__init__(self, parent)
+
+        self.jobs: "queue.Queue[Optional[Job]]" = jobs if jobs is not None else queue.Queue()
+
+        self.waits_ns: Deque[Tuple[int, int]] = collections.deque(maxlen=4096)  # recent (started_ns, wait_ns)
+        self.runs_ns: Deque[Tuple[int, int]] = collections.deque(maxlen=4096)  # recent (finished_ns, run_ns)
+
+        self._job_ids = itertools.count(1)
+        self._thread_ids = itertools.count()
+        self._outstanding = 0
+        self._outstanding_lock = threading.Lock()
+
+        self.threads: List[QThread] = []
+        self.workers: List[ServiceWorker] = []
+        self.running = False
+        self.retiring = 0  # retire requests no worker has picked up yet
+
+        self._sig_dropped.connect(self.on_job_failed, Qt.QueuedConnection)
+
+        for _ in range(threads):
+            self.add_worker()
+
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    @property
+    def thread_count(self) -> int:
+        """
+        Worker threads that will still be around once pending retire requests are picked up
+        """
+        return len(self.threads) - self.retiring
+
+    @property
+    def outstanding(self) -> int:
+        """
+        Jobs submitted but not yet finished, queued or running
+        """
+        return self._outstanding
+
+    def oldest_wait_ns(self) -> int:
+        """
+        How long the job at the head of the queue has been waiting, 0 when nothing is queued
+        """
+        if isinstance(self.jobs, BoundedJobQueue):
+            head = self.jobs.head()
+        else:
+            with self.jobs.mutex:
+                head = next((job for job in self.jobs.queue if job is not None), None)
+
+        return time.monotonic_ns() - head.submitted_ns if head is not None else 0
+
+    def add_worker(self) -> ServiceWorker:
+        """
+        Add one more worker thread, started straight away if the service is running
+        """
+        thread = QThread(self)
+        thread.setObjectName(f"service-worker-{next(self._thread_ids)}")
+
+        worker = ServiceWorker(self.jobs, self.waits_ns, self.runs_ns)
+        worker.moveToThread(thread)
+
+        thread.started.connect(worker.run_it)
+        worker.sig_worker_done.connect(thread.quit, Qt.DirectConnection)  # shutdown() may be blocked in wait()
+        thread.finished.connect(functools.partial(self._forget, thread, worker))
+
+        worker.sig_job_started.connect(self.sig_job_started)
+        worker.sig_job_done.connect(self.on_job_done)
+        worker.sig_job_failed.connect(self.on_job_failed)
+
+        self.threads.append(thread)
+        self.workers.append(worker)
+
+        if self.running:
+            thread.start()
+
+        return worker
+
+    def retire_worker(self):
+        """
+        Ask one worker thread to exit, whichever picks the request up next, so it waits behind queued jobs
+        """
+        self.retiring += 1
+        self.jobs.put(None)
+
+    def _forget(self, thread: QThread, worker: ServiceWorker):
+        if self.running:  # retired while the service carries on, shutdown() keeps its list to wait on
+            self.retiring -= 1
+            self.threads.remove(thread)
+            self.workers.remove(worker)
+            thread.deleteLater()
+        worker.deleteLater()
+
+    def start(self):
+        self.running = True
+
+        for thread in self.threads:
+            if not thread.isRunning():
+                thread.start()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> int:
+        """
+        Queue fn(*args, **kwargs) for the next free worker, safe to call from any thread
+        :return: job id reported back through the job signals
+        """
+        job = Job(next(self._job_ids), fn, args, kwargs)
+
+        with self._outstanding_lock:
+            self._outstanding += 1
+
+        try:
+            dropped = self.jobs.put(job)  # a BoundedJobQueue may drop a job to make room, or time out
+        except Exception:
+            self._complete(signal=False)
+            raise
+
+        if dropped is not None:  # queued, the dropped job may be this one and its id is not returned yet
+            self._sig_dropped.emit(dropped.job_id, JobDropped(self.jobs.policy))
+
+        return job.job_id
+
+    def _complete(self, signal: bool = True):
+        with self._outstanding_lock:
+            self._outstanding -= 1
+            drained = not self._outstanding
+
+        if drained and signal:
+            self.sig_worker_done.emit()
+
+    @pyqtSlot(int, object)
+    def on_job_done(self, job_id: int, result: object):
+        self.sig_job_done.emit(job_id, result)
+        self._complete()
+
+    @pyqtSlot(int, object)
+    def on_job_failed(self, job_id: int, error: object):
+        self.sig_job_failed.emit(job_id, error)
+        self._complete()
+
+    @pyqtSlot()
+    def shutdown(self, wait: bool = True):
+        """
+        Let the workers finish what is already queued, then stop their threads
+        :param wait: block until every thread has exited
+        """
+        if not self.running:
+            return
+        self.running = False
+
+        for _ in self.threads:
+            self.jobs.put(None)
+
+        if wait:
+            for thread in list(self.threads):
+                thread.wait()
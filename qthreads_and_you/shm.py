@@ -0,0 +1,140 @@
+"""
+Shared memory payload transport
+
+Author: Ben Sutton
+Description: Inside one process pyqtSignal(object) hands over a reference, but once work moves into a
+ProcessWorker every result is pickled, piped and unpickled, and for big arrays or images the copies dominate.
+SharedBuffer puts the payload in a multiprocessing.shared_memory block instead.  Only a small SharedHandle goes
+through the signal / pipe, the receiving side maps the same memory and reads it through a memoryview or a
+NumPy array without copying.  Blocks are reference counted per process, whoever owns the block unlinks it when
+the last reference is released.
+
+"""
+
+import threading
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+try:
+    import numpy
+except ImportError:  # NumPy views are optional, memoryviews always work
+    numpy = None
+
+
+class SharedHandle:
+    """
+    Picklable description of a shared block, this is what crosses threads and processes.
+    """
+    __slots__ = ("name", "nbytes", "shape", "dtype")
+
+    def __init__(self, name: str, nbytes: int, shape: Optional[Tuple[int, ...]] = None, dtype: Optional[str] = None):
+        self.name = name
+        self.nbytes = nbytes
+        self.shape = shape
+        self.dtype = dtype
+
+    def __getstate__(self):
+        return self.name, self.nbytes, self.shape, self.dtype
+
+    def __setstate__(self, state):
+        self.name, self.nbytes, self.shape, self.dtype = state
+
+    def __repr__(self) -> str:
+        return f"SharedHandle({self.name!r}, {self.nbytes})"
+
+
+class SharedBuffer:
+    """
+    A mapped shared memory block with a reference count.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, nbytes: int, owner: bool,
+                 shape: Optional[Tuple[int, ...]] = None, dtype: Optional[str] = None):
+        self.shm = shm
+        self.nbytes = nbytes
+        self.owner = owner  # unlink the block when the last reference goes
+        self.shape = shape
+        self.dtype = dtype
+
+        self._refs = 1
+        self._lock = threading.Lock()
+        self._views = []  # exported memoryviews, released before the mapping is closed
+
+    @classmethod
+    def create(cls, nbytes: int, shape: Optional[Tuple[int, ...]] = None, dtype: Optional[str] = None) -> "SharedBuffer":
+        """
+        New block owned by the caller, fill it through memoryview() / ndarray() then pass handle() along
+        """
+        return cls(shared_memory.SharedMemory(create=True, size=max(nbytes, 1)), nbytes, True, shape, dtype)
+
+    @classmethod
+    def attach(cls, handle: SharedHandle, owner: bool = True) -> "SharedBuffer":
+        """
+        Map a block created elsewhere
+        :param owner: take over unlinking, the usual case for the receiving side of a transfer
+        """
+        return cls(shared_memory.SharedMemory(name=handle.name), handle.nbytes, owner, handle.shape, handle.dtype)
+
+    def handle(self) -> SharedHandle:
+        return SharedHandle(self.shm.name, self.nbytes, self.shape, self.dtype)
+
+    def detach(self) -> SharedHandle:
+        """
+        Hand ownership to whoever attaches the returned handle, and drop this side's mapping
+        """
+        handle = self.handle()
+        self.owner = False
+        self.release()
+        return handle
+
+    def memoryview(self) -> memoryview:
+        view = self.shm.buf[:self.nbytes]
+        self._views.append(view)
+        return view
+
+    def ndarray(self, shape: Optional[Tuple[int, ...]] = None, dtype: Optional[str] = None):
+        """
+        Zero copy NumPy view of the block.  Drop the array before the last release(): while it is alive the mapping
+        cannot be closed and release() raises BufferError, after unlinking the block all the same.
+        """
+        if numpy is None:
+            raise RuntimeError("NumPy is not installed, use memoryview() instead")
+
+        dtype = numpy.dtype(dtype or self.dtype or "uint8")
+        shape = shape or self.shape or (self.nbytes // dtype.itemsize,)
+        return numpy.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+
+    def acquire(self) -> "SharedBuffer":
+        with self._lock:
+            if self._refs <= 0:
+                raise ValueError("SharedBuffer has already been released")
+            self._refs += 1
+        return self
+
+    def release(self):
+        """
+        Drop one reference, the last one closes the mapping and, for the owner, unlinks the block
+        """
+        with self._lock:
+            self._refs -= 1
+            if self._refs:
+                return
+
+        try:
+            for view in self._views:
+                view.release()
+            self._views.clear()
+
+            self.shm.close()
+        except BufferError:
+            raise BufferError(f"{self.shm.name} released while a NumPy array or other export of its memory is "
+                              f"still alive, drop those before the last release()") from None
+        finally:
+            if self.owner:  # unlinked either way, the name must not leak in /dev/shm
+                self.shm.unlink()
+
+    def __enter__(self) -> "SharedBuffer":
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
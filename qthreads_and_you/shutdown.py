@@ -0,0 +1,163 @@
+"""
+Deadline bounded shutdown for worker threads
+
+Author: Ben Sutton
+Description: The examples' closeEvent only prints, so closing mid job either hangs or ends in "QThread: Destroyed
+while thread is still running".  ShutdownCoordinator keeps track of every worker thread the app creates.  On close
+it signals all of them at once, cancellation callbacks, requestInterruption() and quit(), then waits for them
+against a single overall deadline and reports whichever thread overran it.  A thread that overruns is never torn
+down while it runs: the coordinator holds on to it and emits sig_overrun_stopped once the last one finishes, and
+BaseExampleWindow refuses the close until then.
+
+"""
+
+import functools
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PyQt5 import sip
+from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal, pyqtSlot
+
+logger = logging.getLogger(__name__)
+
+
+class _Tracked:
+    __slots__ = ("name", "thread", "cancel")
+
+    def __init__(self, name: str, thread: QThread, cancel: List[Callable[[], object]]):
+        self.name = name
+        self.thread = thread
+        self.cancel = cancel
+
+
+class ShutdownCoordinator(QObject):
+    """
+    Create it on the GUI thread, track() workers as they are made, call shutdown_all() from closeEvent.
+    """
+    sig_shutdown_done = pyqtSignal(dict)  # the report shutdown_all() returns
+    sig_overrun_stopped = pyqtSignal()  # the last thread that overran the deadline has finished
+
+    def __init__(self, deadline_ms: int = 2000, parent: Optional[QObject] = None):
+        """
+        :param deadline_ms: how long shutdown_all() waits for all threads together
+        """
+        QObject.__init__(self, parent)
+
+        self.deadline_ms = deadline_ms
+        self._tracked: List[_Tracked] = []
+        self._owners: List[Tuple[str, QObject]] = []
+        self._overrun: List[_Tracked] = []  # held until they finish so nothing deletes them while running
+
+    def track(self, thread: QThread, *cancel: Callable[[], object], name: Optional[str] = None) -> QThread:
+        """
+        Register a worker thread
+        :param thread: QThread, or Worker(QThread) subclass, to stop on shutdown
+        :param cancel: callables that ask the thread's work to stop, e.g. a CancellationToken's cancel
+        :param name: used in the report, defaults to the thread's objectName or class name
+        :return: the thread, so the call can wrap construction
+        """
+        name = name or thread.objectName() or type(thread).__name__
+        self._tracked.append(_Tracked(name, thread, list(cancel)))
+        return thread
+
+    def track_workers(self, owner: QObject, name: Optional[str] = None):
+        """
+        Register everything owned by a WorkerPool, WorkerService or AsyncWorker, its threads are looked up at
+        shutdown time so threads added or retired later (see AutoScaler) are covered too
+        """
+        self._owners.append((name or type(owner).__name__, owner))
+
+    def threads(self) -> List[QThread]:
+        """
+        Every tracked thread that still exists, running or not
+        """
+        return [t.thread for t in self._all()]
+
+    def overrun(self) -> List[str]:
+        """
+        Names of the threads that overran the last deadline and are still running
+        """
+        return [t.name for t in self._overrun if not sip.isdeleted(t.thread) and t.thread.isRunning()]
+
+    def running(self) -> int:
+        """
+        How many tracked threads are running
+        """
+        return len(self._live())
+
+    def _live(self) -> List[_Tracked]:
+        return [t for t in self._all() if t.thread.isRunning()]
+
+    def _all(self) -> List[_Tracked]:
+        self._tracked = [t for t in self._tracked if not sip.isdeleted(t.thread)]  # deleteLater'd threads
+        tracked = list(self._tracked)
+
+        for name, owner in self._owners:
+            if sip.isdeleted(owner):
+                continue
+
+            stop = getattr(owner, "shutdown", None) or getattr(owner, "stop")
+            threads = owner.threads if hasattr(owner, "threads") else [owner.worker_thread]
+            for index, thread in enumerate(threads):
+                cancel = [functools.partial(stop, wait=False)] if index == 0 else []  # one stop covers them all
+                tracked.append(_Tracked(f"{name}[{index}]", thread, cancel))
+
+        return [t for t in tracked if not sip.isdeleted(t.thread)]
+
+    def shutdown_all(self) -> Dict:
+        """
+        Signal every tracked thread to stop, then wait for all of them against one deadline
+        :return: report with the elapsed time and the names of threads still running at the deadline
+        """
+        start_ns = time.monotonic_ns()
+        live = self._live()
+
+        for tracked in live:  # everything is told first, so the threads wind down in parallel
+            for cancel in tracked.cancel:
+                try:
+                    cancel()
+                except Exception:
+                    logger.exception("cancelling %s failed", tracked.name)
+            tracked.thread.requestInterruption()
+            tracked.thread.quit()
+
+        deadline_ns = start_ns + self.deadline_ms * 1_000_000
+        overrun = []
+        for tracked in live:
+            remaining_ms = max(0, (deadline_ns - time.monotonic_ns()) // 1_000_000)
+            if not tracked.thread.wait(int(remaining_ms)):
+                overrun.append(tracked.name)
+                self._hold(tracked)
+
+        report = {
+            "threads": len(live),
+            "elapsed_ms": (time.monotonic_ns() - start_ns) / 1e6,
+            "deadline_ms": self.deadline_ms,
+            "overrun": overrun,
+        }
+
+        if overrun:
+            logger.warning("shutdown deadline of %d ms overrun by: %s", self.deadline_ms, ", ".join(overrun))
+        else:
+            logger.info("%d worker threads stopped in %.1f ms", len(live), report["elapsed_ms"])
+
+        self.sig_shutdown_done.emit(report)
+        return report
+
+    def _hold(self, tracked: _Tracked):
+        if any(t.thread is tracked.thread for t in self._overrun):
+            return
+
+        self._overrun.append(tracked)
+        tracked.thread.finished.connect(self._check_overrun)
+        QTimer.singleShot(0, self._check_overrun)  # in case it finished before the connection was made
+
+    @pyqtSlot()
+    def _check_overrun(self):
+        if not self._overrun or self.overrun():
+            return
+
+        self._overrun.clear()
+        logger.info("threads that overran the shutdown deadline have finished")
+        self.sig_overrun_stopped.emit()
@@ -0,0 +1,57 @@
+"""
+Small statistics helpers
+
+Author: Ben Sutton
+Description: Fixed bucket histograms and percentiles shared by the watchdog, the profiler, the autoscaler and the
+benchmarks.
+
+"""
+
+import bisect
+from typing import Dict, Sequence
+
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class Histogram:
+    """
+    Fixed bucket histogram, bucket i counts samples <= bounds[i], the last bucket is everything larger.
+    """
+
+    def __init__(self, bounds: Sequence[float] = BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def as_dict(self) -> Dict:
+        labels = [f"<={b}" for b in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+        }
+
+    def __str__(self) -> str:
+        labels = [f"<={b}" for b in self.bounds] + [f">{self.bounds[-1]}"]
+        return ", ".join(f"{label}: {n}" for label, n in zip(labels, self.counts) if n) or "empty"
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """
+    Nearest rank percentile
+    :param samples: unordered measurements
+    :param pct: 0 - 100
+    """
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
@@ -0,0 +1,189 @@
+"""
+Worker fed table model
+
+Author: Ben Sutton
+Description: A worker that hands hundreds of thousands of rows to the GUI thread as one list, to be poured into a
+QTableWidget, freezes ExampleWindow for seconds.  StreamingTableModel lets workers append rows from their own
+thread as they go.  Rows are staged under a lock and the GUI thread moves at most max_rows_per_flush of them into
+the model each frame, between beginInsertRows() / endInsertRows(), so the view only ever lays out a frame's worth
+of new rows.  Each column is stored as one array.array (or a list for Python objects) instead of an object per
+row or per cell.  The flush timer only runs while rows are staged.
+
+    self.model = StreamingTableModel([("id", "q"), ("value", "d"), ("label", "O")], parent=self)
+    self.add_table_view(self.model)  # BaseExampleWindow
+    self.model.append_rows(rows)  # then from the worker thread, as often as it likes
+
+"""
+
+import array
+import threading
+from typing import List, Optional, Sequence, Tuple, Union
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QObject, QTimer, pyqtSignal, pyqtSlot
+from PyQt5.QtWidgets import QAbstractItemView, QHeaderView, QTableView, QWidget
+
+Column = Union[array.array, list]
+
+
+def _column(typecode: str) -> Column:
+    return [] if typecode == "O" else array.array(typecode)
+
+
+class StreamingTableModel(QAbstractTableModel):
+    """
+    Thread safe append_rows() / append_columns() for workers, everything else on the GUI thread.
+
+    Create it on the GUI thread.
+    """
+    _sig_arm = pyqtSignal()  # internal, starts the flush timer once rows are staged
+
+    def __init__(self, columns: Sequence[Tuple[str, str]], max_rows_per_flush: int = 5000, interval_ms: int = 16,
+                 parent: Optional[QObject] = None):
+        """
+        :param columns: (name, array typecode) per column, "q" ints, "d" floats, "O" for anything else
+        :param max_rows_per_flush: rows moved into the model per frame, the rest wait for the next one
+        :param interval_ms: flush interval, one frame at 60 Hz by default
+        """
+        QAbstractTableModel.__init__(self, parent)
+
+        self.names = [name for name, _ in columns]
+        self.typecodes = [typecode for _, typecode in columns]
+        self.max_rows_per_flush = max_rows_per_flush
+
+        self.columns: List[Column] = [_column(t) for t in self.typecodes]
+        self.rows = 0
+
+        self.staged_rows = 0
+        self.flush_count = 0
+
+        self._lock = threading.Lock()
+        self._staged: List[Column] = [_column(t) for t in self.typecodes]
+        self._armed = False  # the flush timer runs, or has been asked to start
+        self._closed = False
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.flush)
+
+        self._sig_arm.connect(self._arm, Qt.QueuedConnection)  # a QTimer can only be started from its own thread
+
+    def append_rows(self, rows: Sequence[Sequence[object]]):
+        """
+        Stage rows, each a sequence with one value per column, safe to call from any thread
+        """
+        if not rows:
+            return
+        self.append_columns(list(zip(*rows)))
+
+    def append_columns(self, columns: Sequence[Sequence[object]]):
+        """
+        Stage rows given column by column, e.g. NumPy arrays or array.arrays, safe to call from any thread
+        """
+        lengths = {len(values) for values in columns}
+        if len(columns) != len(self._staged) or len(lengths) != 1:
+            raise ValueError(f"expected {len(self._staged)} columns of equal length")
+
+        converted = [_column(t) for t in self.typecodes]  # converted first, a bad value must not leave a column longer
+        for column, values in zip(converted, columns):
+            column.extend(values)
+
+        with self._lock:
+            for staged, column in zip(self._staged, converted):
+                staged.extend(column)
+            self.staged_rows += lengths.pop()
+
+            arm = not self._armed and not self._closed
+            self._armed = True
+
+        if arm:
+            self._sig_arm.emit()
+
+    @pyqtSlot()
+    def _arm(self):
+        if self._armed and not self._closed:
+            self.timer.start()
+
+    @pyqtSlot()
+    def flush(self):
+        """
+        Move up to max_rows_per_flush staged rows into the model, runs on the GUI thread
+        """
+        with self._lock:
+            count = min(self.staged_rows, self.max_rows_per_flush)
+            if count == self.staged_rows:  # nothing left after this one, the next append starts the timer again
+                self._armed = False
+                self.timer.stop()
+            if not count:
+                return
+
+            if count == self.staged_rows:
+                batch, self._staged = self._staged, [_column(t) for t in self.typecodes]
+            else:
+                batch = [staged[:count] for staged in self._staged]
+                for staged in self._staged:
+                    del staged[:count]
+            self.staged_rows -= count
+
+        self.beginInsertRows(QModelIndex(), self.rows, self.rows + count - 1)
+        for column, values in zip(self.columns, batch):
+            column.extend(values)
+        self.rows += count
+        self.endInsertRows()
+
+        self.flush_count += 1
+
+    def close(self):
+        """
+        Stop the flush timer and move in everything still staged
+        """
+        self._closed = True
+        self.timer.stop()
+        while self.staged_rows:
+            self.flush()
+
+    def clear(self):
+        self.beginResetModel()
+        with self._lock:
+            self._staged = [_column(t) for t in self.typecodes]
+            self.staged_rows = 0
+        self.columns = [_column(t) for t in self.typecodes]
+        self.rows = 0
+        self.endResetModel()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.rows
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        return self.columns[index.column()][index.row()]
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        return self.names[section] if orientation == Qt.Horizontal else section + 1
+
+
+def make_table_view(model: QAbstractTableModel, parent: Optional[QWidget] = None) -> QTableView:
+    """
+    QTableView set up for a large, growing model: fixed row heights so nothing is measured per row, and it follows
+    new rows only while already scrolled to the bottom
+    """
+    view = QTableView(parent)
+    view.setModel(model)
+    view.setSelectionBehavior(QAbstractItemView.SelectRows)
+    view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+
+    rows = view.verticalHeader()
+    rows.setSectionResizeMode(QHeaderView.Fixed)
+    rows.setDefaultSectionSize(view.fontMetrics().height() + 6)
+
+    scrollbar = view.verticalScrollBar()
+    follow = [True]
+    scrollbar.valueChanged.connect(lambda value: follow.__setitem__(0, value == scrollbar.maximum()))
+    scrollbar.rangeChanged.connect(lambda low, high: follow[0] and scrollbar.setValue(high))
+
+    return view
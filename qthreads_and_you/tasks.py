@@ -0,0 +1,145 @@
+"""
+Generator based cooperative tasks on a worker thread
+
+Author: Ben Sutton
+Description: run_it() and run() in the examples are one blocking call, the worker's event loop can not deliver
+slots, cancellation or progress until the whole job is over.  TaskRunner takes generator functions instead and
+steps them from the worker's event loop: every yield is a point where the task may be paused, and once a task
+has used up its time slice the runner hands control back to the event loop before stepping it again.  Worker
+responsiveness is then bounded by slice_ms plus one chunk, not by the length of the job.
+
+"""
+
+import collections
+import itertools
+import threading
+import time
+from typing import Callable, Deque, Generator, Optional, Set
+
+from PyQt5.QtCore import Qt, QObject, pyqtSignal, pyqtSlot
+
+
+class _Task:
+    __slots__ = ("task_id", "gen", "progress")
+
+    _NO_PROGRESS = object()
+
+    def __init__(self, task_id: int, gen: Generator):
+        self.task_id = task_id
+        self.gen = gen
+        self.progress = self._NO_PROGRESS
+
+
+class TaskRunner(QObject):
+    """
+    moveToThread() it onto a worker QThread, submit() / cancel() are safe from any thread.
+    """
+    sig_task_progress = pyqtSignal(int, object)  # task_id, last value yielded during the slice
+    sig_task_done = pyqtSignal(int, object)  # task_id, the generator's return value
+    sig_task_failed = pyqtSignal(int, object)  # task_id, exception
+    sig_task_cancelled = pyqtSignal(int)  # task_id
+    sig_worker_done = pyqtSignal()  # no tasks left
+
+    sig_wake = pyqtSignal()  # internal, schedules the next step on the runner's thread
+
+    def __init__(self, slice_ms: float = 10.0, parent: Optional[QObject] = None):
+        """
+        :param slice_ms: how long one task may run before the event loop gets a turn
+        """
+        QObject.__init__(self, parent)
+
+        self.slice_ns = int(slice_ms * 1e6)
+
+        self._lock = threading.Lock()
+        self._tasks: Deque[_Task] = collections.deque()  # round robin
+        self._cancelled: Set[int] = set()
+        self._live: Set[int] = set()  # submitted and not yet finished, queued or running
+        self._task_ids = itertools.count(1)
+        self._wake_pending = False
+
+        self.sig_wake.connect(self.step, Qt.QueuedConnection)
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    def submit(self, gen_fn: Callable[..., Generator], *args, **kwargs) -> int:
+        """
+        Start gen_fn(*args, **kwargs) as a cooperative task
+        :return: task id reported back by the task signals
+        """
+        task = _Task(next(self._task_ids), gen_fn(*args, **kwargs))
+
+        with self._lock:
+            self._tasks.append(task)
+            self._live.add(task.task_id)
+            wake = not self._wake_pending
+            self._wake_pending = True
+
+        if wake:
+            self.sig_wake.emit()
+
+        return task.task_id
+
+    def cancel(self, task_id: int):
+        """
+        Stop a task at its next yield, its generator is closed so finally blocks run.  Ids of tasks that have
+        finished, or never existed, are ignored.
+        """
+        with self._lock:
+            if task_id in self._live:
+                self._cancelled.add(task_id)
+
+    @pyqtSlot()
+    def step(self):
+        """
+        Run the task at the front of the queue for one time slice
+        """
+        with self._lock:
+            if not self._tasks:
+                self._wake_pending = False
+                return
+            task = self._tasks.popleft()
+
+        finished = self._run_slice(task)
+
+        with self._lock:
+            if finished:
+                self._live.discard(task.task_id)
+                self._cancelled.discard(task.task_id)
+            else:
+                self._tasks.append(task)
+            more = bool(self._tasks)
+            self._wake_pending = more
+
+        if more:
+            self.sig_wake.emit()  # goes to the back of the event queue, queued slots run first
+        else:
+            self.sig_worker_done.emit()
+
+    def _run_slice(self, task: _Task) -> bool:
+        """
+        :return: True once the task has finished, one way or another
+        """
+        deadline = time.monotonic_ns() + self.slice_ns
+        cancelled = self._cancelled  # only ever added to under the lock, a membership test needs none
+
+        try:
+            while task.task_id not in cancelled:  # checked before every step, not only once per slice
+                task.progress = next(task.gen)
+                if time.monotonic_ns() >= deadline:
+                    break
+            else:
+                task.gen.close()
+                self.sig_task_cancelled.emit(task.task_id)
+                return True
+        except StopIteration as stop:
+            self.sig_task_done.emit(task.task_id, stop.value)
+            return True
+        except Exception as e:
+            self.sig_task_failed.emit(task.task_id, e)
+            return True
+
+        # one progress signal per slice no matter how often the task yields
+        self.sig_task_progress.emit(task.task_id, task.progress)
+        return False
@@ -0,0 +1,233 @@
+"""
+Low overhead thread event recorder
+
+Author: Ben Sutton
+Description: print_tid() from the examples walks inspect.stack() and prints synchronously, which costs far more
+than the thread hops it is trying to show.  TraceRecorder instead writes (thread id, function, label, monotonic ns)
+into a ring buffer owned by the calling thread, no locks on the hot path, and can export everything as Chrome
+trace-event JSON for chrome://tracing or https://ui.perfetto.dev.  Buffers are looked up by native thread id, not
+kept in a threading.local: PyQt throws a moveToThread worker's Python thread state, locals included, away after every
+queued slot call.  When a thread exits (on QThread.finished for QThreads) its events move into one shared ring buffer,
+and past max_threads live buffers the oldest is retired too, so starting thousands of short lived workers does not
+keep thousands of buffers around.
+
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import Qt, QObject, QThread, pyqtSlot
+
+_getframe = sys._getframe
+_monotonic_ns = time.monotonic_ns
+_native_id = threading.get_native_id
+
+Event = Tuple[int, str, str, int]  # native thread id, function, label, monotonic ns
+
+
+class _RingBuffer:
+    """
+    Fixed size event buffer, only ever appended to by the thread that owns it.
+    """
+    __slots__ = ("tid", "name", "events", "append")
+
+    def __init__(self, tid: int, name: str, capacity: int):
+        self.tid = tid
+        self.name = name
+        self.events: deque = deque(maxlen=capacity)  # oldest events fall off the front once full
+        self.append = self.events.append
+
+    def snapshot(self) -> List[Event]:
+        """
+        Events still held by the buffer, oldest first
+        """
+        while True:
+            try:
+                return list(self.events)
+            except RuntimeError:  # owner appended mid copy, try again
+                pass
+
+
+class _Retire:
+    """
+    Kept in a Python thread's threading.local, so it is dropped when the thread exits.
+    """
+    __slots__ = ("recorder", "buf")
+
+    def __init__(self, recorder: "TraceRecorder", buf: _RingBuffer):
+        self.recorder = recorder
+        self.buf = buf
+
+    def __del__(self):
+        self.recorder._retire(self.buf)
+
+
+class _FinishedHook(QObject):
+    """
+    Connected to QThread.finished, which is emitted on the exiting thread.  A real slot, a Python callable would get
+    a proxy QObject on the worker thread that is never deleted once that thread is gone.
+    """
+
+    def __init__(self, recorder: "TraceRecorder"):
+        QObject.__init__(self)
+
+        self.recorder = recorder
+
+    @pyqtSlot()
+    def retire_current(self):
+        buf = self.recorder._buffers.get(_native_id())
+        if buf is not None:
+            self.recorder._retire(buf)
+
+
+class TraceRecorder:
+    """
+    Collects events from any number of threads, one ring buffer per thread.
+    """
+
+    def __init__(self, capacity: int = 65536, retired_names: int = 1024, max_threads: int = 256):
+        """
+        :param capacity: events kept per live thread, and for all exited threads together
+        :param retired_names: exited threads whose names are kept for exported traces
+        :param max_threads: live buffers kept, past this the oldest is retired, covers threads whose exit is not seen
+        """
+        self.capacity = capacity
+        self.retired_names = retired_names
+        self.max_threads = max_threads
+
+        self._local = threading.local()
+        self._finished_hook = _FinishedHook(self)
+        self._buffers: Dict[int, _RingBuffer] = {}  # native thread id -> buffer, oldest first
+        self._buffers_lock = threading.Lock()  # only taken the first time a thread records, and when it exits
+
+        self._retired: deque = deque(maxlen=capacity)  # events of threads that have exited
+        self._retired_names: Dict[int, str] = {}
+
+    def _buffer(self) -> _RingBuffer:
+        thread = threading.current_thread()
+        qthread = QThread.currentThread()
+        buf = _RingBuffer(_native_id(), qthread.objectName() or thread.name, self.capacity)
+
+        with self._buffers_lock:
+            self._buffers[buf.tid] = buf
+            oldest = list(self._buffers.values())[:max(0, len(self._buffers) - self.max_threads)]
+        for old in oldest:
+            self._retire(old)
+
+        if isinstance(thread, threading._DummyThread):  # a QThread, its Python state may not outlast this slot call
+            try:
+                qthread.finished.connect(self._finished_hook.retire_current, Qt.DirectConnection | Qt.UniqueConnection)
+            except TypeError:  # connected on an earlier run of the same QThread
+                pass
+        elif thread is not threading.main_thread():  # a Python thread keeps its locals until it exits
+            self._local.retire = _Retire(self, buf)
+
+        return buf
+
+    def _retire(self, buf: _RingBuffer):
+        with self._buffers_lock:
+            if self._buffers.get(buf.tid) is buf:
+                del self._buffers[buf.tid]
+            self._retired.extend(buf.events)
+            buf.events.clear()  # retired early over max_threads, its exit must not add them again
+
+            self._retired_names.pop(buf.tid, None)  # native ids get reused, keep the latest name
+            self._retired_names[buf.tid] = buf.name
+            while len(self._retired_names) > self.retired_names:
+                del self._retired_names[next(iter(self._retired_names))]
+
+    def record(self, label: str = "", depth: int = 1):
+        """
+        Record an event for the calling thread
+        :param label: free form comment, same role as print_tid's comment
+        :param depth: how many frames up to look for the function name, 1 is the caller
+        """
+        buf = self._buffers.get(_native_id()) or self._buffer()
+
+        buf.append((buf.tid, _getframe(depth).f_code.co_name, label, _monotonic_ns()))
+
+    def name_thread(self, name: str):
+        """
+        Label the calling thread in exported traces, QThreads otherwise show up as Dummy-N
+        """
+        buf = self._buffers.get(_native_id()) or self._buffer()
+        buf.name = name
+
+    def events(self) -> List[Event]:
+        """
+        Every recorded event from every thread, ordered by timestamp
+        """
+        with self._buffers_lock:
+            buffers = list(self._buffers.values())
+            retired = list(self._retired)
+
+        return sorted(retired + [e for buf in buffers for e in buf.snapshot()], key=lambda e: e[3])
+
+    def clear(self):
+        with self._buffers_lock:
+            for buf in self._buffers.values():
+                buf.events.clear()
+            self._retired.clear()
+            self._retired_names.clear()
+
+    def print_events(self, file=None):
+        """
+        Print the recorded events in the same format print_tid used to
+        """
+        for tid, func, label, _ in self.events():
+            print(f"tid: {tid}, from: {func} {label}", file=file or sys.stdout)
+
+    def chrome_trace(self) -> Dict:
+        """
+        Recorded events as a Chrome trace-event document
+        """
+        pid = os.getpid()
+
+        with self._buffers_lock:
+            names = dict(self._retired_names)
+            names.update((buf.tid, buf.name) for buf in self._buffers.values())
+
+        trace_events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in names.items()
+        ]
+        trace_events.extend(
+            {"name": f"{func} {label}".strip(), "cat": func, "ph": "i", "s": "t", "pid": pid, "tid": tid, "ts": ns / 1000}
+            for tid, func, label, ns in self.events()
+        )
+
+        return {"traceEvents": trace_events, "displayTimeUnit": "ns"}
+
+    def export_chrome_trace(self, path: str):
+        """
+        Write the recorded events to path as Chrome trace-event JSON
+        """
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+recorder = TraceRecorder()
+
+
+def print_tid(comment: str = ""):
+    """
+    Drop in replacement for the examples' print_tid, records instead of printing
+    """
+    recorder.record(comment, depth=2)
+
+
+def dump_trace(path: Optional[str] = None):
+    """
+    Print the recorded events and, when given a path or QTHREADS_TRACE is set, write them as Chrome trace JSON
+    """
+    recorder.print_events()
+
+    path = path or os.environ.get("QTHREADS_TRACE")
+    if path:
+        recorder.export_chrome_trace(path)
+        print(f"trace written to {path}")
@@ -0,0 +1,117 @@
+"""
+GUI thread stall watchdog
+
+Author: Ben Sutton
+Description: Example 1's on_slowstop_clicked freezes the GUI for 10 seconds and nothing says so.  StallWatchdog
+runs a heartbeat QTimer on the GUI thread to measure how late the event loop gets around to it, plus a plain
+Python sentinel thread that grabs the GUI thread's stack from sys._current_frames() whenever the loop has not
+turned for longer than the threshold.  The logged stack points straight at the slot doing the blocking.
+
+"""
+
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+
+from qthreads_and_you.stats import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class StallWatchdog(QObject):
+    """
+    Create and start() on the GUI thread.
+    """
+    sig_stall = pyqtSignal(float, str)  # stall duration in ms, formatted GUI thread stack, emitted after the stall
+
+    def __init__(self, threshold_ms: float = 200.0, heartbeat_ms: int = 50, parent: Optional[QObject] = None):
+        """
+        :param threshold_ms: how long the event loop may go without turning before it counts as a stall
+        :param heartbeat_ms: heartbeat timer interval
+        """
+        QObject.__init__(self, parent)
+
+        self.threshold_ms = threshold_ms
+        self.heartbeat_ms = heartbeat_ms
+
+        self.lag_ms = Histogram()  # how late each heartbeat fired
+        self.stall_ms = Histogram()  # length of every stall the sentinel caught
+
+        self.stacks: List[str] = []  # one captured stack per stall
+
+        self._gui_ident = threading.get_ident()
+        self._last_beat_ns = time.monotonic_ns()
+        self._stall_stack: Optional[str] = None  # set by the sentinel while a stall is in progress
+        self._stop = threading.Event()
+        self._sentinel: Optional[threading.Thread] = None
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(heartbeat_ms)
+        self.timer.timeout.connect(self.on_heartbeat)
+
+    def start(self):
+        self._gui_ident = threading.get_ident()
+        self._last_beat_ns = time.monotonic_ns()
+        self._stop.clear()
+
+        self.timer.start()
+
+        self._sentinel = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+        self._sentinel.start()
+
+    def stop(self):
+        self.timer.stop()
+        self._stop.set()
+
+        if self._sentinel is not None:
+            self._sentinel.join()
+            self._sentinel = None
+
+        # stopped from inside the stalling slot (example 1 closes itself), count the stall up to now
+        self._end_stall((time.monotonic_ns() - self._last_beat_ns) / 1e6)
+
+    @pyqtSlot()
+    def on_heartbeat(self):
+        now = time.monotonic_ns()
+        elapsed_ms = (now - self._last_beat_ns) / 1e6
+        self._last_beat_ns = now
+
+        self.lag_ms.add(max(0.0, elapsed_ms - self.heartbeat_ms))
+
+        self._end_stall(elapsed_ms)
+
+    def _end_stall(self, elapsed_ms: float):
+        stack, self._stall_stack = self._stall_stack, None
+        if stack is not None:
+            self.stall_ms.add(elapsed_ms)
+            logger.warning("GUI thread stalled for %.0f ms", elapsed_ms)
+            self.sig_stall.emit(elapsed_ms, stack)
+
+    def _watch(self):
+        poll_s = self.threshold_ms / 4000
+
+        while not self._stop.wait(poll_s):
+            stalled_ms = (time.monotonic_ns() - self._last_beat_ns) / 1e6
+            if stalled_ms < self.threshold_ms + self.heartbeat_ms or self._stall_stack is not None:
+                continue
+
+            frame = sys._current_frames().get(self._gui_ident)
+            if frame is None:
+                continue
+
+            stack = "".join(traceback.format_stack(frame))
+            self.stacks.append(stack)
+            self._stall_stack = stack
+            logger.warning("GUI event loop has not turned for %.0f ms, GUI thread is at:\n%s", stalled_ms, stack)
+
+    def report(self) -> Dict:
+        return {"heartbeat_lag_ms": self.lag_ms.as_dict(), "stall_ms": self.stall_ms.as_dict()}
+
+    def log_histograms(self):
+        logger.info("heartbeat lag ms: %s", self.lag_ms)
+        logger.info("stall duration ms: %s", self.stall_ms)
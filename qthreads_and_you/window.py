@@ -0,0 +1,178 @@
+"""
+Shared window scaffolding for the examples
+
+Author: Ben Sutton
+Description: Every example used to carry its own copy of ExampleWindow and a long import block.  BaseExampleWindow
+holds the common parts, the examples subclass it and only add their workers, extra widgets and signals.
+
+"""
+
+import logging
+import os
+import sys
+from typing import Optional, Type
+
+from PyQt5.QtCore import Qt, QAbstractItemModel, pyqtSlot
+from PyQt5.QtGui import QKeyEvent
+from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QWidget, QPushButton, QFormLayout, QTableView
+
+from qthreads_and_you.profiler import ProfiledSlots, slot_profiler
+from qthreads_and_you.shutdown import ShutdownCoordinator
+from qthreads_and_you.trace import print_tid, dump_trace
+
+
+class BaseExampleWindow(ProfiledSlots, QMainWindow):  # slots are timed when QTHREADS_PROFILE_SLOTS=1
+    """
+    Main GUI for Examples.
+    """
+    title = "QThreading Example"
+    button_text = "Push to Slowly Close"
+
+    def __init__(self):
+        QMainWindow.__init__(self)
+
+        self.setWindowFlags(Qt.Window)
+
+        self.setWindowTitle("Example")
+        self.setMinimumSize(400, 150)
+
+        print_tid("(pre-ui)")
+
+        self.shutdown_coordinator = ShutdownCoordinator(parent=self)  # setup_workers() tracks its threads here
+        self.shutdown_coordinator.sig_overrun_stopped.connect(self.close)
+
+        self.setup_workers()
+        self.setup_ui()
+        self.connect_signals_slots()
+
+        print_tid("(post-ui)")
+
+    def setup_workers(self):
+        """
+        Create any workers / threads, runs before the UI is built.  Track them with self.shutdown_coordinator
+        so closing the window stops them.
+        """
+
+    def setup_ui(self):
+        """
+        Setup any UI components
+        """
+        lbl_title = QLabel(self.title)
+        self.btn_slowstop = QPushButton(self.button_text)
+
+        self.setCentralWidget(QWidget())
+        self.centralWidget().setLayout(QFormLayout())
+
+        self.centralWidget().layout().addWidget(lbl_title)
+        self.centralWidget().layout().addWidget(QLabel(" "))
+        self.centralWidget().layout().addWidget(self.btn_slowstop)
+
+    def add_table_view(self, model: QAbstractItemModel) -> QTableView:
+        """
+        Add a table under the example's widgets, call it from setup_ui() after BaseExampleWindow.setup_ui()
+        :param model: usually a StreamingTableModel a worker is feeding
+        """
+        from qthreads_and_you.table_model import make_table_view  # only the examples with a table pay for it
+
+        view = make_table_view(model, self)
+        self.centralWidget().layout().addWidget(view)
+        self.setMinimumSize(600, 400)
+        return view
+
+    def connect_signals_slots(self):
+        """
+        Connect any signals / slots
+        """
+        self.btn_slowstop.clicked.connect(self.on_slowstop_clicked)
+
+    @pyqtSlot(bool)
+    def on_slowstop_clicked(self, value: bool):
+        print_tid()
+
+    @pyqtSlot()
+    def closeEvent(self, *args, **kwargs):
+        """
+        Overloaded closeEvent
+        :param args:
+        :param kwargs:
+        """
+        print_tid()
+        report = self.shutdown_coordinator.shutdown_all()
+
+        if report["overrun"]:  # destroying the window would destroy threads that are still running
+            args[0].ignore()  # sig_overrun_stopped closes it again once they are done
+
+    @pyqtSlot(QKeyEvent)
+    def keyPressEvent(self, e: QKeyEvent):
+        if e.key() == Qt.Key_Escape:
+            self.close()
+
+
+def _start_metrics(window: BaseExampleWindow) -> Optional[tuple]:
+    port = os.environ.get("QTHREADS_METRICS_PORT")
+    if not port and not os.environ.get("QTHREADS_METRICS_JSON"):
+        return None
+
+    from qthreads_and_you.metrics import MetricsRegistry, MetricsServer  # not paid for unless asked for
+    from qthreads_and_you.watchdog import StallWatchdog
+
+    registry = MetricsRegistry()
+    watchdog = StallWatchdog()  # heartbeat lag for the registry, example 1 also runs its own
+    registry.watch_watchdog(watchdog)
+    registry.watch_coordinator(window.shutdown_coordinator)
+    if slot_profiler.enabled:
+        registry.watch_profiler(slot_profiler)
+
+    server = MetricsServer(registry, port=int(port)) if port else None
+    if server is not None:
+        server.start()
+
+    watchdog.start()
+    registry.start()
+    return registry, watchdog, server
+
+
+def _stop_metrics(registry, watchdog, server):
+    watchdog.stop()
+    registry.stop()
+    if server is not None:
+        server.stop()
+
+    path = os.environ.get("QTHREADS_METRICS_JSON")
+    if path:
+        registry.dump_json(path)
+
+
+def run_example(window_cls: Type[BaseExampleWindow]) -> int:
+    """
+    The examples' __main__ block, builds the app and window and runs the event loop
+    :return: the event loop's exit code
+    """
+    logging.basicConfig(level=logging.INFO)
+
+    app = QApplication(sys.argv)
+
+    test_window = window_cls()
+
+    metrics = _start_metrics(test_window)  # only when QTHREADS_METRICS_PORT or QTHREADS_METRICS_JSON is set
+
+    from qthreads_and_you.affinity import ThreadPlacement  # imported on use, importing an example stays light
+
+    placement = ThreadPlacement.from_environment(parent=test_window)  # QTHREADS_GUI_CPUS / _WORKER_CPUS / _PRIORITY
+    if placement is not None:
+        placement.apply_gui()
+        for thread in test_window.shutdown_coordinator.threads():
+            placement.track(thread)
+
+    test_window.show()
+
+    exit_code = app.exec()  # app.exec() starts event loop
+
+    if metrics is not None:
+        _stop_metrics(*metrics)
+    if placement is not None:
+        placement.log_report()
+    dump_trace()  # print_tid only records, events are printed once the event loop is done
+    if slot_profiler.enabled:
+        slot_profiler.log_report()
+    return exit_code